@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the renderers in generate.py.
+
+Compares the single-pass inline markdown scanner with the old regex cascade
+on realistic Korean post lines and on adversarial lines (long runs of
+unmatched '*' and '[') that made the cascade quadratic, and checks the
+documented cases where the scanner's output intentionally differs.
+
+Also times the brief renderer against its per-line-closure predecessor on
+link-dense briefs, and checks both produce identical (golden) output on the
+local brief archive plus edge cases.
+
+Usage:
+  python3 scripts/bench_render.py [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import html
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate  # noqa: E402
+
+
+def legacy_inline_md(s: str) -> str:
+    """The regex cascade _inline_md replaced (kept for comparison only)."""
+    s = html.escape(s, quote=True)
+    s = re.sub(r"\[([^\]]+?)\]\((https?://[^\s\)]+)\)", r"<a href=\"\2\">\1</a>", s)
+    s = re.sub(r"`([^`]+?)`", r"<code>\1</code>", s)
+    s = re.sub(r"\*\*([^*]+?)\*\*", r"<strong>\1</strong>", s)
+    s = re.sub(r"(?<!\*)\*([^*]+?)\*(?!\*)", r"<em>\1</em>", s)
+    s = re.sub(r"\[\^(\d+)\]", r"<sup class=\"fn\">[\1]</sup>", s)
+    return s
+
+
+def legacy_brief_text_to_html(text: str) -> str:
+    """The brief renderer _brief_text_to_html replaced (kept as the golden reference)."""
+    url_re = re.compile(r'(https?://[^\s<>]+)')
+    lines_out = []
+    for line in text.splitlines():
+        s = line.strip()
+        m = re.match(r'^\[([^\]]+)\]\s*$', s)
+        if m:
+            lines_out.append(f'<h2>{html.escape(m.group(1).strip())}</h2>')
+            continue
+        if not s:
+            lines_out.append('<br>')
+            continue
+        escaped = html.escape(s)
+
+        def _linkify(match):
+            url = match.group(1)
+            trailing = ''
+            while url and url[-1] in '.,)]':
+                trailing = url[-1] + trailing
+                url = url[:-1]
+            return f'<a href="{url}" target="_blank">{url}</a>{trailing}'
+
+        escaped = url_re.sub(_linkify, escaped)
+        lines_out.append(escaped + '<br>')
+    return '\n'.join(lines_out)
+
+
+BRIEF_EDGE_CASES = [
+    '[ KR ]\n[산업 구조]\n[]\n[ ]\n[a]b]\n  [x]  \n[링크 https://a.b/c]',
+    '출처: https://example.com/a?b=1&c=2). 다음 (https://x.y/z),\nhttps://t.co/abc].\nhttp://h/<tag>',
+    'R&D "quoted" \'single\' <b>bold</b>\n\n\n\u2028줄\r\n끝 https://a.b/"q"',
+    '',
+]
+
+
+def brief_texts() -> list[str]:
+    """Brief files from the configured sources, or a synthetic one."""
+    texts = []
+    for src in generate.brief_sources(generate.load_cfg()):
+        texts += [p.read_text(encoding='utf-8') for p in sorted(src['base'].glob(f"*/{src['filename']}"))]
+    return texts
+
+
+def link_dense_brief(target_chars: int) -> str:
+    """A long InvestAnalyst-style brief: headers, bullets, a URL on most lines."""
+    block = (
+        '[ 시장 ]\n'
+        '- 나스닥 1.2% 상승, 반도체 강세 (출처: https://www.reuters.com/markets/us/stocks-2026-02-20/).\n'
+        '- SEC, 현물 ETF 규정 개정안 공개: https://www.sec.gov/newsroom/press-releases/2026-18\n'
+        '- 연준 의사록 "인하 신중" https://www.federalreserve.gov/monetarypolicy/fomcminutes20260128.htm,\n'
+        '  요약 없음\n'
+        '\n'
+    )
+    return block * (target_chars // len(block) + 1)
+
+
+# emphasis nesting the cascade handled by running bold before italic
+INLINE_EDGE_CASES = [
+    '***bold italic***',
+    '*a **b** c*',
+    '**a** and *b*',
+    '*a***b**',
+    '**b***c*',
+    '**a*',
+    '*a*b*',
+    'a * b * c',
+    '***',
+    '[**x**](https://example.com) *y*[^2]',
+]
+
+# where the scanner deliberately differs from the cascade (which emitted
+# overlapping tags or formatted code contents): line -> expected output
+INTENDED_DIFFERENCES = {
+    '`**x**`': '<code>**x**</code>',
+    '`[a](https://e.com)`': '<code>[a](https://e.com)</code>',
+    '`a[^1]`': '<code>a[^1]</code>',
+    '`a*b`*c*': '<code>a*b</code><em>c</em>',
+    '`*`a*`': '<code>*</code>a*`',
+    '*`a*`b*': '<em>`a</em>`b*',
+    '**a `b** c`': '<strong>a `b</strong> c`',
+    '*a `b* c`': '<em>a `b</em> c`',
+    '[a `b](https://e.com) c`': '<a href="https://e.com">a `b</a> c`',
+}
+
+
+def post_lines() -> list[str]:
+    """Body text lines of posts/*.md (headings and list markers stripped)."""
+    lines = []
+    for p in sorted(glob.glob('posts/*.md')):
+        for line in Path(p).read_text(encoding='utf-8').splitlines():
+            line = line.strip().lstrip('-# ').strip()
+            if line and not line.startswith('<'):
+                lines.append(line)
+    return lines or ['**리드타임** KPI는 *평균*이 아니라 분포로 본다 `p90` [링크](https://example.com)[^1]']
+
+
+def korean_lines(target_chars: int) -> list[str]:
+    """Post lines repeated up to ~target_chars (a long Korean post)."""
+    lines = post_lines()
+    out, n = [], 0
+    while n < target_chars:
+        for line in lines:
+            out.append(line)
+            n += len(line)
+    return out
+
+
+def timed(fn, lines: list[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+
+    cases = [
+        ('korean posts (~1 MB)', korean_lines(1_000_000)),
+        ("5k unmatched '*'", ['*' + ' a*' * 5000]),
+        ("5k unmatched '['", ['[가' * 5000]),
+        ("5k '[' before one link", ['[' * 5000 + 'x](https://example.com/' + 'a' * 200 + ')']),
+        ("5k '**' openers", ['**a ' * 5000]),
+    ]
+
+    print(f"{'case':32} {'scanner':>10} {'cascade':>10}")
+    for name, lines in cases:
+        new = timed(generate._inline_md, lines, args.repeat)
+        old = timed(legacy_inline_md, lines, args.repeat)
+        print(f"{name:32} {new * 1000:9.1f}ms {old * 1000:9.1f}ms")
+
+    # sanity: on real content and emphasis edge cases the scanner matches the
+    # cascade (modulo the cascade's stray backslashes in href=\"...\" / class=\"fn\")
+    mismatches = [
+        line for line in post_lines() + INLINE_EDGE_CASES
+        if generate._inline_md(line) != legacy_inline_md(line).replace('\\"', '"')
+    ]
+    print(f"mismatches vs cascade on post lines + edge cases: {len(mismatches)}")
+    for line in mismatches[:5]:
+        print(f"  {line!r}")
+    # ...and the documented differences render as intended (and still differ)
+    drift = [
+        line for line, want in INTENDED_DIFFERENCES.items()
+        if generate._inline_md(line) != want or legacy_inline_md(line).replace('\\"', '"') == want
+    ]
+    print(f"intended differences not rendered as documented: {len(drift)}/{len(INTENDED_DIFFERENCES)}")
+    for line in drift:
+        print(f"  {line!r} -> {generate._inline_md(line)!r}")
+
+    print(f"\n{'brief case':32} {'compiled':>10} {'legacy':>10}")
+    for name, texts in [('link-dense brief (~1 MB)', [link_dense_brief(1_000_000)]),
+                        ('local brief archive', brief_texts())]:
+        if not texts:
+            continue
+        new = timed(generate._brief_text_to_html, texts, args.repeat)
+        old = timed(legacy_brief_text_to_html, texts, args.repeat)
+        print(f"{name:32} {new * 1000:9.1f}ms {old * 1000:9.1f}ms")
+
+    golden = brief_texts() + BRIEF_EDGE_CASES + [link_dense_brief(10_000)]
+    brief_mismatches = [t for t in golden if generate._brief_text_to_html(t) != legacy_brief_text_to_html(t)]
+    print(f"brief mismatches vs legacy renderer: {len(brief_mismatches)}/{len(golden)}")
+    return 1 if mismatches or drift or brief_mismatches else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
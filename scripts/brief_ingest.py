@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Brief ingestion: find the daily brief files and tell which ones changed.
+
+Briefs live outside the repo, one directory per day:
+
+  <base>/<YYYY-MM-DD>/<filename>
+
+The sources (label, slug, base, filename) come from "brief_sources" in
+site/config.json. Directories are listed with os.scandir and each brief
+file is stat()ed; its (size, mtime_ns) is compared with what the metadata
+store remembers from the previous build, so an unchanged brief is never
+opened. A brief whose stat changed is read and hashed; if the hash matches
+it only gets its stat refreshed.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+from build_manifest import sha256_bytes, sha256_json
+
+DEFAULT_SOURCES = [
+    {'label': '통합 브리핑', 'slug': 'morning',
+     'base': '~/.openclaw/workspace/memory/briefing', 'filename': 'final_briefing_ko.txt'},
+    {'label': 'InvestAnalyst 데일리 브리프', 'slug': 'invest',
+     'base': '~/.openclaw/workspace/memory/investanalyst', 'filename': 'daily_brief_ko.txt'},
+]
+
+_DATE_DIR = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class Brief(NamedTuple):
+    rank: int          # position of the source in brief_sources
+    kind: str          # source slug, also the docs/briefs/<kind>/ directory
+    label: str
+    date: str
+    path: str
+    size: int
+    mtime_ns: int
+    key: str           # hash of title + text; the build manifest key of the page
+    text: str | None   # only set when the file was read in this scan
+
+
+def brief_sources(cfg: dict) -> list[dict]:
+    """Configured sources with base expanded to a Path."""
+    return [dict(s, base=Path(os.path.expanduser(s['base'])))
+            for s in cfg.get('brief_sources') or DEFAULT_SOURCES]
+
+
+def brief_title(label: str, date: str) -> str:
+    return f"{label} — {date}"
+
+
+def scan_briefs(sources: list[dict], known: dict) -> list[Brief]:
+    """Every brief under sources, newest first per source.
+
+    known: {(kind, date): (size, mtime_ns, key)} from the previous build;
+    files whose size and mtime match are not read.
+    """
+    out = []
+    for rank, src in enumerate(sources):
+        try:
+            it = os.scandir(src['base'])
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with it:
+            dates = sorted((e.name for e in it if _DATE_DIR.match(e.name) and e.is_dir()), reverse=True)
+        for date in dates:
+            path = os.path.join(src['base'], date, src['filename'])
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            prev = known.get((src['slug'], date))
+            if prev and tuple(prev[:2]) == (st.st_size, st.st_mtime_ns):
+                out.append(Brief(rank, src['slug'], src['label'], date, path,
+                                 st.st_size, st.st_mtime_ns, prev[2], None))
+                continue
+            raw = Path(path).read_bytes()
+            key = sha256_json([brief_title(src['label'], date), sha256_bytes(raw)])
+            out.append(Brief(rank, src['slug'], src['label'], date, path,
+                             st.st_size, st.st_mtime_ns, key, raw.decode('utf-8')))
+    return out
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Persistent build manifest for incremental site generation.
+
+For every output generate.py writes, the manifest records the hash of the
+inputs it was rendered from, the renderer version and the config hash.
+A later build re-renders an output only when one of those three changed
+(or the file has gone missing from docs/).
+
+The manifest lives outside docs/ (default: .cache/build/manifest.json) and is
+not committed; a fresh clone simply does one full build.
+
+OutputChanges collects which files under docs/ a build actually created,
+changed or deleted, so publishers can stage exactly those paths.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str | Path) -> str:
+    """Hash a file in chunks (for inputs too large to read at once)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sha256_text(s: str) -> str:
+    return sha256_bytes(s.encode('utf-8'))
+
+
+def sha256_json(obj) -> str:
+    """Stable hash of a JSON-serialisable value (key order independent)."""
+    return sha256_text(json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(',', ':')))
+
+
+def write_if_changed(path: str | Path, data: str | bytes) -> str | None:
+    """Write data to path unless the file already holds exactly these bytes.
+
+    Returns 'created', 'changed' or None (left untouched).
+    """
+    path = Path(path)
+    raw = data.encode('utf-8') if isinstance(data, str) else data
+    try:
+        if path.stat().st_size == len(raw) and path.read_bytes() == raw:
+            return None
+        status = 'changed'
+    except FileNotFoundError:
+        status = 'created'
+    path.write_bytes(raw)
+    return status
+
+
+class OutputChanges:
+    """Paths (relative to the cwd) a build created, changed or deleted."""
+
+    def __init__(self):
+        self.created: set[str] = set()
+        self.changed: set[str] = set()
+        self.deleted: set[str] = set()
+
+    def note(self, path: str | Path, status: str | None) -> None:
+        if not status:
+            return
+        key = os.path.normpath(str(path))
+        if status == 'created' and key in self.deleted:
+            self.deleted.discard(key)  # removed and re-created in one build
+            status = 'changed'
+        getattr(self, status).add(key)
+
+    def write(self, path: str | Path, data: str | bytes) -> bool:
+        status = write_if_changed(path, data)
+        self.note(path, status)
+        return status is not None
+
+    def remove(self, path: str | Path) -> None:
+        os.unlink(path)
+        self.note(path, 'deleted')
+
+    def as_dict(self) -> dict:
+        return {k: sorted(getattr(self, k)) for k in ('created', 'changed', 'deleted')}
+
+
+class BuildManifest:
+    """output path -> {src, renderer, cfg} bookkeeping for one build."""
+
+    def __init__(self, path: str | Path, *, renderer: str, cfg_hash: str):
+        self.path = Path(path)
+        self.renderer = renderer
+        self.cfg_hash = cfg_hash
+        self.outputs: dict[str, dict] = {}
+        self._touched: set[str] = set()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if data.get('version') != MANIFEST_VERSION:
+            return
+        self.outputs = data.get('outputs') or {}
+
+    def reset(self) -> None:
+        """Forget every recorded output (forces a full rebuild)."""
+        self.outputs = {}
+
+    def is_fresh(self, out_path: str | Path, src_hash: str) -> bool:
+        """True if out_path exists and was rendered from exactly these inputs."""
+        key = str(out_path)
+        self._touched.add(key)
+        e = self.outputs.get(key)
+        if not e:
+            return False
+        if e.get('src') != src_hash or e.get('renderer') != self.renderer or e.get('cfg') != self.cfg_hash:
+            return False
+        return os.path.exists(key)
+
+    def keep(self, out_path: str | Path) -> bool:
+        """Trust an existing record without re-hashing its inputs.
+
+        Used when the caller knows which sources changed; True if out_path was
+        built by this renderer/config and still exists.
+        """
+        key = str(out_path)
+        e = self.outputs.get(key)
+        if not e or e.get('renderer') != self.renderer or e.get('cfg') != self.cfg_hash:
+            return False
+        if not os.path.exists(key):
+            return False
+        self._touched.add(key)
+        return True
+
+    def source(self, out_path: str | Path) -> str | None:
+        """The input hash out_path was last recorded with."""
+        return (self.outputs.get(str(out_path)) or {}).get('src')
+
+    def record(self, out_path: str | Path, src_hash: str) -> None:
+        key = str(out_path)
+        self._touched.add(key)
+        self.outputs[key] = {'src': src_hash, 'renderer': self.renderer, 'cfg': self.cfg_hash}
+
+    def save(self) -> None:
+        """Write the manifest atomically, dropping outputs not seen this build."""
+        self.outputs = {k: v for k, v in self.outputs.items() if k in self._touched}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(
+            json.dumps({'version': MANIFEST_VERSION, 'outputs': self.outputs},
+                       ensure_ascii=False, sort_keys=True, indent=1),
+            encoding='utf-8')
+        os.replace(tmp, self.path)
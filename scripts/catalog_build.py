@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Build catalog/index.json incrementally from the per-item files in catalog/items/.
+
+Outside collectors drop one JSON file per research item into catalog/items/
+(e.g. rss_wwwsecgov_<hash>.json). This merges them into catalog/index.json:
+
+- a stat/hash cache (.cache/build/catalog_items.json) remembers, per item
+  file, its (size, mtime_ns, sha256) plus the few fields needed for
+  deduplication and ordering, so unchanged files are never opened again;
+- items are deduplicated by id and by normalized URL (tracking parameters,
+  fragments, "www." and trailing slashes ignored); the first file name in
+  sort order wins;
+- syndicated copies (same story, different id/URL) are clustered by MinHash
+  over the words of the normalized title + summary, with LSH banding so only
+  items sharing a band are compared; each cluster keeps its earliest
+  published item and the others are listed in catalog/duplicates.json as
+  {id: canonical id};
+- the index is sorted by parsed published_at (newest first, undated last);
+- only new/changed items are read; they are merge-sorted into a streaming
+  pass over the existing index, which is written atomically together with
+  its index.ndjson copy (see catalog_io.write_index).
+
+If catalog/index.json was not written by this tool (or the cache is gone),
+the first run re-reads every item file once.
+
+Usage:
+  python3 scripts/catalog_build.py [--items catalog/items] [--index catalog/index.json] [--full]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import html
+import json
+import os
+import re
+import struct
+import sys
+import urllib.parse
+from pathlib import Path
+
+from build_manifest import sha256_bytes
+from catalog_io import iter_catalog_items, published_ts, write_index
+
+CACHE_PATH = Path('.cache/build/catalog_items.json')
+CACHE_VERSION = 2
+DUPLICATES_VERSION = 1
+_TRACKING = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+# near-duplicates: MinHash signatures of NUM_PERM 16-bit values, banded into
+# BANDS keys of ROWS values; items sharing a band key are candidates, and a
+# candidate pair is merged when its signatures agree on >= SIMILARITY of the
+# values (an estimate of the word-set Jaccard similarity)
+NUM_PERM = 32
+ROWS = 4
+BANDS = NUM_PERM // ROWS
+SIMILARITY = 0.7
+MIN_WORDS = 4          # shorter texts are too generic to cluster
+SUMMARY_WORDS = 16     # feeds truncate summaries at different lengths
+BUCKET_LIMIT = 64      # compare against at most this many items per band key
+_SIG = struct.Struct(f'>{NUM_PERM}H')
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'[^\W_]+')
+_TRUNCATED = re.compile(r'(?:\s*(?:…|\.\.\.|\[…\]|\[\.\.\.\]))+\s*$')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an item URL for duplicate detection."""
+    u = urllib.parse.urlsplit((url or '').strip())
+    if not u.netloc:
+        return (url or '').strip()
+    host = (u.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if u.port and u.port not in (80, 443):
+        host += f':{u.port}'
+    query = urllib.parse.urlencode(sorted(
+        (k, v) for k, v in urllib.parse.parse_qsl(u.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING)))
+    return urllib.parse.urlunsplit(('', host, u.path.rstrip('/') or '/', query, ''))
+
+
+def sort_key(item: dict) -> tuple:
+    """Index order: newest published_at first, then id."""
+    return (-published_ts(item.get('published_at') or ''), str(item.get('id') or ''))
+
+
+def _plain(text: str) -> str:
+    # summaries arrive as HTML, sometimes entity-encoded twice (&amp;nbsp;)
+    return html.unescape(_TAG.sub(' ', html.unescape(html.unescape(text or '')))).replace('\xa0', ' ')
+
+
+def near_dup_words(item: dict) -> set[str]:
+    """Normalized words compared for near-duplicates: the title plus the start
+    of the summary, dropping a trailing ellipsis and the word it may have cut."""
+    summary = _plain(item.get('summary') or '')
+    cut = _TRUNCATED.search(summary)
+    words = _WORD.findall(summary[:cut.start()].lower() if cut else summary.lower())
+    if cut and words:
+        words.pop()
+    return set(_WORD.findall(_plain(item.get('title') or '').lower()) + words[:SUMMARY_WORDS])
+
+
+def minhash(words: set[str]) -> str:
+    """MinHash signature of a word set as NUM_PERM 4-hex-digit values.
+
+    The NUM_PERM hash functions are the 16-bit slices of one blake2b digest
+    per word.
+    """
+    hs = [_SIG.unpack(hashlib.blake2b(w.encode('utf-8'), digest_size=_SIG.size).digest()) for w in words]
+    return ''.join(f'{min(col):04x}' for col in zip(*hs))
+
+
+def _similarity(x: str, y: str) -> float:
+    return sum(x[i:i + 4] == y[i:i + 4] for i in range(0, len(x), 4)) / NUM_PERM
+
+
+def _near_duplicates(files: dict, names) -> dict:
+    """{name: canonical name} for items clustered as near-duplicates.
+
+    Linear in the number of items: each one is only compared with the items
+    already in its BANDS band buckets, which are capped at BUCKET_LIMIT.
+    """
+    parent: dict = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    width = ROWS * 4
+    buckets: dict = {}
+    for name in names:
+        sig = files[name].get('sig')
+        if not sig:
+            continue
+        for b in range(BANDS):
+            bucket = buckets.setdefault((b, sig[b * width:(b + 1) * width]), [])
+            for other in bucket:
+                if _similarity(sig, files[other]['sig']) >= SIMILARITY:
+                    ra, rb = find(name), find(other)
+                    if ra != rb:
+                        parent[ra] = rb
+                        parent.setdefault(rb, rb)
+            if len(bucket) < BUCKET_LIMIT:
+                bucket.append(name)
+
+    clusters: dict = {}
+    for name in parent:
+        clusters.setdefault(find(name), []).append(name)
+    out = {}
+    for members in clusters.values():
+        # canonical: earliest published (undated last), then file name
+        canon = min(members, key=lambda n: (not files[n]['ts'], files[n]['ts'], n))
+        out.update((n, canon) for n in members if n != canon)
+    return out
+
+
+def _load_cache(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    return data if data.get('version') == CACHE_VERSION else {}
+
+
+def _save_cache(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _winners(files: dict) -> set:
+    """File names whose item survives deduplication by id and normalized URL."""
+    ids, urls, won = set(), set(), set()
+    for name in sorted(files):
+        e = files[name]
+        if e.get('invalid') or e['id'] in ids or (e['nurl'] and e['nurl'] in urls):
+            continue
+        ids.add(e['id'])
+        if e['nurl']:
+            urls.add(e['nurl'])
+        won.add(name)
+    return won
+
+
+def build_catalog(items_dir: Path = Path('catalog/items'), index_path: Path = Path('catalog/index.json'),
+                  *, cache_path: Path = CACHE_PATH, full: bool = False) -> dict:
+    """Bring index_path up to date with items_dir.
+
+    Returns counts: scanned, read (files opened), added, updated, removed,
+    duplicates (same id/URL), near_duplicates (MinHash clusters), invalid,
+    total; 'written' is False when nothing changed.
+    """
+    cache = {} if full else _load_cache(cache_path)
+    old_files: dict = cache.get('files') or {}
+    try:
+        st = index_path.stat()
+        index_stat = [st.st_size, st.st_mtime_ns]
+    except FileNotFoundError:
+        index_stat = None
+    # the existing index can only be merged into if we wrote it
+    incremental = bool(old_files) and index_stat is not None and cache.get('index') == index_stat
+
+    files: dict = {}
+    fresh: dict = {}  # name -> parsed item, for files read this run
+    stats = {'scanned': 0, 'read': 0, 'added': 0, 'updated': 0, 'removed': 0,
+             'duplicates': 0, 'invalid': 0}
+    with os.scandir(items_dir) as it:
+        entries = sorted((e for e in it if e.name.endswith('.json') and e.is_file()), key=lambda e: e.name)
+    for entry in entries:
+        stats['scanned'] += 1
+        st = entry.stat()
+        prev = old_files.get(entry.name)
+        if incremental and prev and prev['stat'] == [st.st_size, st.st_mtime_ns]:
+            files[entry.name] = prev
+            continue
+        raw = Path(entry.path).read_bytes()
+        stats['read'] += 1
+        sha = sha256_bytes(raw)
+        if incremental and prev and prev.get('sha') == sha:
+            files[entry.name] = dict(prev, stat=[st.st_size, st.st_mtime_ns])
+            continue
+        try:
+            item = json.loads(raw)
+            if not isinstance(item, dict):
+                raise ValueError('not an object')
+        except ValueError as e:
+            print(f"catalog_build: skip {entry.name}: {e}", file=sys.stderr)
+            files[entry.name] = {'stat': [st.st_size, st.st_mtime_ns], 'sha': sha, 'invalid': True}
+            continue
+        item.setdefault('id', entry.name[:-len('.json')])
+        words = near_dup_words(item)
+        files[entry.name] = {'stat': [st.st_size, st.st_mtime_ns], 'sha': sha, 'id': str(item['id']),
+                             'nurl': normalize_url(item.get('url') or ''),
+                             'ts': published_ts(item.get('published_at') or ''),
+                             'sig': minhash(words) if len(words) >= MIN_WORDS else None}
+        fresh[entry.name] = item
+
+    won = _winners(files)
+    stats['invalid'] = sum(1 for e in files.values() if e.get('invalid'))
+    stats['duplicates'] = len(files) - stats['invalid'] - len(won)
+    near = _near_duplicates(files, sorted(won))
+    won -= near.keys()
+    stats['near_duplicates'] = len(near)
+    old_won = {n for n, e in old_files.items() if e.get('indexed')} if incremental else set()
+
+    # ids to pull out of the existing index: items changed, removed or now losing
+    drop = {old_files[n]['id'] for n in old_won if n not in won or n in fresh}
+    # items to insert: winners read this run, plus winners that were losers before
+    insert_names = sorted(n for n in won if n in fresh or n not in old_won)
+    inserts = []
+    for name in insert_names:
+        item = fresh.get(name)
+        if item is None:  # promoted duplicate: not read this run
+            item = json.loads((items_dir / name).read_bytes())
+            item.setdefault('id', name[:-len('.json')])
+            stats['read'] += 1
+        inserts.append(item)
+        if name in old_won:
+            stats['updated'] += 1
+        else:
+            stats['added'] += 1
+    stats['removed'] = len(old_won - won)
+    for name in files:
+        if not files[name].get('invalid'):
+            files[name]['indexed'] = name in won
+
+    changed = not incremental or bool(drop or inserts)
+    if changed:
+        inserts.sort(key=sort_key)
+        if incremental:
+            existing = (it for it in iter_catalog_items(index_path) if str(it.get('id')) not in drop)
+            merged = heapq.merge(existing, inserts, key=sort_key)
+        else:
+            merged = iter(inserts)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        stats['total'] = write_index(index_path, merged)
+        st = index_path.stat()
+        index_stat = [st.st_size, st.st_mtime_ns]
+    else:
+        stats['total'] = len(won)
+
+    dup_path = index_path.with_name('duplicates.json')
+    dups = {files[n]['id']: files[c]['id'] for n, c in sorted(near.items())}
+    data = json.dumps({'version': DUPLICATES_VERSION, 'duplicate_of': dups}, ensure_ascii=False, indent=2) + '\n'
+    if not dup_path.exists() or dup_path.read_text(encoding='utf-8') != data:
+        dup_path.write_text(data, encoding='utf-8')
+
+    _save_cache(cache_path, {'version': CACHE_VERSION, 'index': index_stat, 'files': files})
+    stats['written'] = changed
+    return stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Merge catalog/items/*.json into catalog/index.json.')
+    ap.add_argument('--items', default='catalog/items', help='directory of per-item JSON files')
+    ap.add_argument('--index', default='catalog/index.json', help='index file to update')
+    ap.add_argument('--full', action='store_true', help='ignore the cache and re-read every item file')
+    args = ap.parse_args(argv)
+
+    stats = build_catalog(Path(args.items), Path(args.index), full=args.full)
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Precomputed facet and term posting lists for the catalog page.
+
+Written next to the catalog shards (see catalog_io.write_shards):
+
+  docs/catalog/facets/manifest.json      facet values, months and term buckets
+  docs/catalog/facets/v/<hash8>.json     posting list of one facet value
+  docs/catalog/facets/d/<YYYY-MM>.<hash8>.json  {day: posting list} for one month
+  docs/catalog/facets/t/<bucket>.<hash8>.json   {term: posting list} for one bucket
+
+A posting list is the sorted list of doc ids, delta-encoded (first id, then
+gaps) as a JSON array of small ints. Doc ids count from the oldest item
+(id = total - 1 - position in the newest-first index), so they match the
+shard numbering and stay stable when new items arrive at the top.
+
+Facets: source_name, market_axis (multi-valued), access_level, and
+published_at by day. Terms come from title + summary (see tokenize(); the
+catalog page splits queries the same way) and are spread over buckets by
+FNV-1a of their UTF-8 bytes, so a keyword costs one small download.
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import re
+from array import array
+from datetime import datetime, timezone
+
+from build_manifest import sha256_text
+from catalog_io import published_ts
+
+FACETS = ('source_name', 'market_axis', 'access_level')
+# term buckets are sized by postings so each download stays around 100 KB
+POSTINGS_PER_BUCKET = 32768
+MANIFEST_VERSION = 1
+
+_TAG = re.compile(r'<[^>]+>')
+_WORD = re.compile(r'[^\W_]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or that the this to was were will with'.split())
+
+
+def tokenize(text: str) -> set[str]:
+    """Distinct index terms of a title/summary (lowercased words, 2+ chars)."""
+    text = _TAG.sub(' ', html.unescape(text or '')).lower()
+    return {w for w in _WORD.findall(text) if len(w) > 1 and w not in STOPWORDS}
+
+
+def fnv1a(term: str) -> int:
+    """32-bit FNV-1a over UTF-8 (mirrored in the catalog page's JS)."""
+    h = 0x811c9dc5
+    for b in term.encode('utf-8'):
+        h = ((h ^ b) * 0x01000193) & 0xffffffff
+    return h
+
+
+def delta(ids) -> list[int]:
+    out, prev = [], 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+def _values(item: dict, facet: str) -> list[str]:
+    v = item.get(facet)
+    if facet == 'source_name' and not v:
+        v = item.get('source')
+    if facet == 'market_axis' and not v:
+        v = item.get('axis')
+    if isinstance(v, list):
+        return [str(x) for x in v if x]
+    return [str(v)] if v else []
+
+
+def build_facets(items, out_dir, changes, *, total: int) -> dict:
+    """Write the facet/term index for items (newest first, total of them).
+
+    Posting lists are accumulated as compact int arrays. Items arrive newest
+    first and ids count down, so each list is built in descending order and
+    reversed once when it is encoded.
+    """
+    facets: dict[str, dict[str, array]] = {f: {} for f in FACETS}
+    days: dict[str, array] = {}
+    terms: dict[str, array] = {}
+    for pos, item in enumerate(items):
+        doc = total - 1 - pos
+        for f in FACETS:
+            for v in set(_values(item, f)):
+                facets[f].setdefault(v, array('I')).append(doc)
+        ts = published_ts(item.get('published_at') or '')
+        if ts:
+            day = datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+            days.setdefault(day, array('I')).append(doc)
+        for t in tokenize(f"{item.get('title') or ''} {item.get('summary') or ''}"):
+            terms.setdefault(t, array('I')).append(doc)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keep: set[str] = set()
+
+    def emit(sub: str, prefix: str, obj) -> str:
+        data = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+        rel = f"{sub}/{prefix}{sha256_text(data)[:8]}.json"
+        if rel not in keep:
+            (out_dir / sub).mkdir(exist_ok=True)
+            changes.write(out_dir / rel, data + '\n')
+            keep.add(rel)
+        return rel
+
+    manifest: dict = {'version': MANIFEST_VERSION, 'total': total, 'facets': {}, 'months': {}}
+    for f in FACETS:
+        vals = sorted(facets[f].items(), key=lambda kv: (-len(kv[1]), kv[0]))
+        manifest['facets'][f] = [
+            {'value': v, 'count': len(ids), 'file': emit('v', '', delta(reversed(ids)))} for v, ids in vals]
+
+    by_month: dict[str, dict] = {}
+    for day in sorted(days):
+        by_month.setdefault(day[:7], {})[day] = delta(reversed(days[day]))
+    for month, lists in by_month.items():
+        manifest['months'][month] = {'file': emit('d', f'{month}.', lists),
+                                     'count': sum(len(days[d]) for d in lists)}
+
+    postings = sum(len(ids) for ids in terms.values())
+    buckets = 1
+    while buckets * POSTINGS_PER_BUCKET < postings:
+        buckets *= 2
+    shards: list[dict] = [{} for _ in range(buckets)]
+    for t in sorted(terms):
+        shards[fnv1a(t) % buckets][t] = delta(reversed(terms[t]))
+    manifest['terms'] = {'buckets': buckets, 'count': len(terms),
+                         'files': [emit('t', f'{b}.', shard) for b, shard in enumerate(shards)]}
+
+    for sub in ('v', 'd', 't'):
+        d = out_dir / sub
+        if d.is_dir():
+            for path in sorted(d.iterdir()):
+                if f'{sub}/{path.name}' not in keep:
+                    changes.remove(path)
+    changes.write(out_dir / 'manifest.json', json.dumps(manifest, ensure_ascii=False, indent=1) + '\n')
+    return manifest
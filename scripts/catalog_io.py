@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Streaming access to the research catalog, and the sharded docs/ export.
+
+catalog/index.json can grow to 100k+ items, so nothing here loads it whole:
+iter_index_items() yields items one by one from the "items" array, and
+write_shards() cuts them into fixed-size JSON shards for docs/catalog/:
+
+  docs/catalog/manifest.json           {"version", "total", "shard_size", "shards": [...]}
+  docs/catalog/shards/<n>.<hash8>.json JSON array of up to shard_size items
+
+Items keep the index order (newest first). Shard numbers count from the
+oldest item, so adding items at the top rewrites only the newest shard; the
+content hash in the file name lets browsers cache shards forever.
+
+write_index() is the streaming counterpart of iter_index_items(): it writes
+a complete index.json (same layout as json.dump(indent=2)) atomically, plus
+index.ndjson next to it: a {"version", "generated_at"} header line, then
+one compact item per line. iter_catalog_items() reads the NDJSON copy when
+its header matches index.json's and falls back to index.json otherwise
+(e.g. after a collector rewrote only the legacy file). Either way items are
+streamed, so memory does not grow with the catalog.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import json
+import os
+from pathlib import Path
+
+from build_manifest import sha256_text
+
+SHARD_SIZE = 500
+MANIFEST_VERSION = 1
+_CHUNK = 1 << 16
+
+
+class _Reader:
+    """Incremental JSON tokenizer over a text file (top-level object only)."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.dec = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > _CHUNK:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.dec.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_index_items(path: str | Path):
+    """Yield the entries of index.json's "items" array one at a time.
+
+    Yields nothing if the file is missing; raises ValueError if it is not a
+    JSON object.
+    """
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        r = _Reader(f)
+        r.expect('{')
+        if r.peek() == '}':
+            return
+        while True:
+            key = r.value()
+            r.expect(':')
+            if key == 'items' and r.peek() == '[':
+                r.expect('[')
+                if r.peek() == ']':
+                    r.pos += 1
+                else:
+                    while True:
+                        yield r.value()
+                        if r.peek() == ',':
+                            r.pos += 1
+                            continue
+                        r.expect(']')
+                        break
+            else:
+                r.value()
+            if r.peek() == ',':
+                r.pos += 1
+                continue
+            r.expect('}')
+            return
+
+
+def ndjson_path(index_path: str | Path) -> Path:
+    return Path(index_path).with_suffix('.ndjson')
+
+
+def index_header(path: str | Path) -> dict | None:
+    """The scalar members of index.json that precede "items" (version,
+    generated_at), read without touching the items; None if missing/invalid."""
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return None
+    with f:
+        r = _Reader(f)
+        head: dict = {}
+        try:
+            r.expect('{')
+            while r.peek() == '"':
+                key = r.value()
+                r.expect(':')
+                if key == 'items':
+                    break
+                head[key] = r.value()
+                if r.peek() != ',':
+                    break
+                r.pos += 1
+        except ValueError:
+            return None
+        return head
+
+
+def iter_ndjson(path: str | Path):
+    """Yield the items of an index.ndjson file (its header line is skipped)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_catalog_items(index_path: str | Path):
+    """Yield the catalog items, from index.ndjson when it is in sync with
+    index_path (same version/generated_at header), else from index_path."""
+    nd = ndjson_path(index_path)
+    try:
+        with open(nd, 'r', encoding='utf-8') as f:
+            head = json.loads(f.readline() or 'null')
+    except (FileNotFoundError, ValueError):
+        head = None
+    if isinstance(head, dict) and head.get('generated_at'):
+        legacy = index_header(index_path)
+        if legacy is None or all(legacy.get(k) == head.get(k) for k in ('version', 'generated_at')):
+            yield from iter_ndjson(nd)
+            return
+    yield from iter_index_items(index_path)
+
+
+def published_ts(value: str) -> float:
+    """Sort key for an item's published_at (RFC 2822 or ISO 8601); 0 if unparseable."""
+    value = (value or '').strip()
+    if not value:
+        return 0.0
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = dt.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return 0.0
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return when.timestamp()
+
+
+def write_index(path: str | Path, items, *, version: int = 1, generated_at: str | None = None) -> int:
+    """Stream items into index.json and index.ndjson via temp files + rename.
+
+    index.json is renamed last, so an interrupted write leaves the NDJSON
+    copy out of sync (and ignored) rather than the reverse. Returns the item
+    count.
+    """
+    path = Path(path)
+    generated_at = generated_at or dt.datetime.now(dt.timezone.utc).isoformat()
+    nd = ndjson_path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    nd_tmp = nd.with_name(nd.name + '.tmp')
+    n = 0
+    with open(tmp, 'w', encoding='utf-8') as f, open(nd_tmp, 'w', encoding='utf-8') as g:
+        f.write('{\n  "version": %s,\n  "generated_at": %s,\n  "items": ['
+                % (json.dumps(version), json.dumps(generated_at, ensure_ascii=False)))
+        g.write(json.dumps({'version': version, 'generated_at': generated_at}, ensure_ascii=False) + '\n')
+        for item in items:
+            body = json.dumps(item, ensure_ascii=False, indent=2).replace('\n', '\n    ')
+            f.write((',\n    ' if n else '\n    ') + body)
+            g.write(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n')
+            n += 1
+        f.write('\n  ]\n}\n' if n else ']\n}\n')
+    os.replace(nd_tmp, nd)
+    os.replace(tmp, path)
+    return n
+
+
+def write_shards(items, out_dir: Path, changes, *, shard_size: int = SHARD_SIZE) -> dict:
+    """Export items into out_dir/shards/ plus out_dir/manifest.json.
+
+    items is a zero-argument callable returning a fresh iterator (it is run
+    twice: once to count, once to write), so at most one shard is held in
+    memory. Unchanged shards are not rewritten; shards no longer referenced
+    are removed. Returns the manifest.
+    """
+    total = sum(1 for _ in items())
+    shard_dir = out_dir / 'shards'
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = []
+    # the newest shard takes the remainder so the older ones stay aligned
+    first = total % shard_size or shard_size
+    batch: list = []
+    seen = 0
+
+    def flush() -> None:
+        number = (total - seen) // shard_size
+        data = json.dumps(batch, ensure_ascii=False, separators=(',', ':'))
+        name = f"{number:05d}.{sha256_text(data)[:8]}.json"
+        changes.write(shard_dir / name, data + '\n')
+        shards.append({'file': f'shards/{name}', 'count': len(batch)})
+
+    for item in items():
+        batch.append(item)
+        seen += 1
+        if seen == first or (seen > first and (seen - first) % shard_size == 0):
+            flush()
+            batch = []
+    if batch:
+        flush()
+
+    keep = {s['file'].split('/', 1)[1] for s in shards}
+    for path in sorted(shard_dir.iterdir()):
+        if path.name not in keep:
+            changes.remove(path)
+
+    manifest = {'version': MANIFEST_VERSION, 'total': total, 'shard_size': shard_size, 'shards': shards}
+    changes.write(out_dir / 'manifest.json', json.dumps(manifest, ensure_ascii=False, indent=1) + '\n')
+    return manifest
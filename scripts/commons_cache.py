@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""On-disk cache for commons_image.py: search responses and downloaded files.
+
+Layout (default: .cache/commons/ in the repo, not committed):
+
+  search/<key>.json   Commons API search response for one normalized query
+  blobs/<sha256><ext> downloaded files, stored once per distinct content
+  index.json          entry bookkeeping: size, fetch time, last use, for
+                      files the url -> content hash mapping, and the HEAD
+                      probe answer (size, type) of each candidate url
+
+Search entries and probe answers expire after search_ttl, file entries after
+file_ttl. When the
+cache grows past max_bytes the least recently used entries are evicted. An
+expired search response is still handed out when the live request fails
+(rate limit), which is better than publishing without an image.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+DAY = 86400
+DEFAULT_SEARCH_TTL = 7 * DAY
+DEFAULT_FILE_TTL = 90 * DAY
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def normalize_query(keywords) -> str:
+    """Case/space/order-insensitive form of a keyword list (Commons search
+    does not care about term order)."""
+    terms = set()
+    for k in keywords:
+        k = re.sub(r"\s+", " ", k.strip().lower())
+        if k:
+            terms.add(k)
+    return " ".join(sorted(terms))
+
+
+def _key(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+class CommonsCache:
+    """Thread-safe TTL + size-bounded LRU cache rooted at one directory."""
+
+    def __init__(self, root: str | Path, *, search_ttl: float = DEFAULT_SEARCH_TTL,
+                 file_ttl: float = DEFAULT_FILE_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.search_ttl = search_ttl
+        self.file_ttl = file_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        (self.root / "search").mkdir(parents=True, exist_ok=True)
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        try:
+            self._index = json.loads((self.root / "index.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._index = {}
+        self._index.setdefault("search", {})  # key -> {size, fetched_at, used}
+        self._index.setdefault("urls", {})    # url -> {blob, fetched_at, used}
+        self._index.setdefault("blobs", {})   # blob name -> size
+        self._index.setdefault("probes", {})  # url -> {bytes, mime, fetched_at}
+
+    # -- search responses ------------------------------------------------
+
+    def get_search(self, query: str, *, allow_stale: bool = False) -> dict | None:
+        key = _key(query)
+        with self._lock:
+            e = self._index["search"].get(key)
+            if not e:
+                return None
+            if not allow_stale and time.time() - e["fetched_at"] > self.search_ttl:
+                return None
+            try:
+                data = json.loads((self.root / "search" / f"{key}.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._index["search"].pop(key, None)
+                return None
+            e["used"] = time.time()
+            self._save()
+            return data
+
+    def put_search(self, query: str, data: dict) -> None:
+        key = _key(query)
+        raw = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            path = self.root / "search" / f"{key}.json"
+            tmp = path.with_name(f"{key}.{os.getpid()}.tmp")
+            tmp.write_text(raw, encoding="utf-8")
+            os.replace(tmp, path)
+            now = time.time()
+            self._index["search"][key] = {"size": len(raw.encode("utf-8")), "fetched_at": now, "used": now}
+            self._evict()
+            self._save()
+
+    # -- HEAD probe answers ----------------------------------------------
+
+    def get_probe(self, url: str) -> dict | None:
+        """{"bytes", "mime"} a HEAD of url returned within search_ttl, or None."""
+        with self._lock:
+            e = self._index["probes"].get(url)
+            if not e or time.time() - e["fetched_at"] > self.search_ttl:
+                return None
+            return {"bytes": e["bytes"], "mime": e["mime"]}
+
+    def put_probes(self, probes: dict) -> None:
+        """Store {url: {"bytes", "mime"}} answers; expired ones are dropped."""
+        now = time.time()
+        with self._lock:
+            entries = self._index["probes"]
+            for url in [u for u, e in entries.items() if now - e["fetched_at"] > self.search_ttl]:
+                del entries[url]
+            for url, p in probes.items():
+                entries[url] = {"bytes": p["bytes"], "mime": p["mime"], "fetched_at": now}
+            self._save()
+
+    # -- downloaded files ------------------------------------------------
+
+    def get_file(self, url: str) -> Path | None:
+        """Cached copy of url's content, or None if absent/expired."""
+        with self._lock:
+            e = self._index["urls"].get(url)
+            if not e or time.time() - e["fetched_at"] > self.file_ttl:
+                return None
+            path = self.root / "blobs" / e["blob"]
+            if not path.exists():
+                self._index["urls"].pop(url, None)
+                return None
+            e["used"] = time.time()
+            self._save()
+            return path
+
+    def put_file(self, url: str, tmp_path: Path, ext: str = "") -> Path:
+        """Move a freshly downloaded file into the content-addressed store."""
+        h = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        blob = h.hexdigest() + ext
+        with self._lock:
+            path = self.root / "blobs" / blob
+            if path.exists():
+                os.unlink(tmp_path)  # same picture already stored (other slug/url)
+            else:
+                shutil.move(str(tmp_path), path)
+            now = time.time()
+            self._index["blobs"][blob] = path.stat().st_size
+            self._index["urls"][url] = {"blob": blob, "fetched_at": now, "used": now}
+            self._evict(keep=blob)
+            self._save()
+            return path
+
+    # -- bookkeeping -----------------------------------------------------
+
+    def _total(self) -> int:
+        return (sum(e["size"] for e in self._index["search"].values())
+                + sum(self._index["blobs"].values()))
+
+    def _evict(self, keep: str = "") -> None:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        blob_used: dict[str, float] = {}
+        for e in self._index["urls"].values():
+            blob_used[e["blob"]] = max(blob_used.get(e["blob"], 0), e["used"])
+        candidates = [(e["used"], "search", k) for k, e in self._index["search"].items()]
+        candidates += [(blob_used.get(b, 0), "blob", b) for b in self._index["blobs"] if b != keep]
+        for _used, kind, k in sorted(candidates):
+            if total <= self.max_bytes:
+                break
+            if kind == "search":
+                total -= self._index["search"].pop(k)["size"]
+                (self.root / "search" / f"{k}.json").unlink(missing_ok=True)
+            else:
+                total -= self._index["blobs"].pop(k)
+                (self.root / "blobs" / k).unlink(missing_ok=True)
+                for url in [u for u, e in self._index["urls"].items() if e["blob"] == k]:
+                    del self._index["urls"][url]
+
+    def _save(self) -> None:
+        path = self.root / "index.json"
+        tmp = path.with_name(f"index.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._index), encoding="utf-8")
+        os.replace(tmp, path)
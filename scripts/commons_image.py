@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """Fetch a suitable image from Wikimedia Commons without an API key.
 
-Given keywords, searches Commons, picks the first usable file, downloads it
-into docs/assets/images/<slug>.<ext>, and returns a markdown/HTML snippet plus credit.
+Given keywords, searches Commons, checks the candidates' real size and type
+with concurrent HEAD requests (answers are cached like search responses), picks the smallest one that still meets the
+dimension/byte budget, downloads it into docs/assets/images/<slug>.<ext>, and
+returns a markdown/HTML snippet plus credit. All requests share one pool of
+keep-alive connections (http_session.py).
+
+Search responses and downloaded files are cached under .cache/commons (see
+commons_cache.py), so retries and republishes do not hit Commons again.
 
 Usage:
-  python3 scripts/commons_image.py --slug <slug> --keywords "k1,k2,k3"
+  python3 scripts/commons_image.py --slug <slug> --keywords "k1,k2,k3" [--no-cache]
+      [--candidates 5] [--min-width 800] [--max-download-mb 25]
+
+From Python (publishers share one cache/session across images):
+  from commons_image import fetch_image
+  meta = fetch_image(slug, "k1,k2,k3", cache=cache, session=session)
 
 Outputs JSON to stdout:
-  {"local_path":"docs/assets/images/...","img_html":"<img ...>","credit":"...","source_url":"...","license":"..."}
+  {"local_path":"docs/assets/images/...","img_html":"<img ...>","credit":"...","source_url":"...","license":"...",
+   "download":{"bytes":...,"seconds":...,"bytes_per_s":...,"cached":false}}
 """
 
 from __future__ import annotations
@@ -17,76 +29,262 @@ import argparse
 import json
 import os
 import re
+import shutil
 import sys
+import time
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from commons_cache import DAY, DEFAULT_MAX_BYTES, CommonsCache, normalize_query
+from http_session import HttpSession
+
 ROOT = Path(__file__).resolve().parents[1]
 OUT_DIR = ROOT / "docs" / "assets" / "images"
+CACHE_DIR = ROOT / ".cache" / "commons"
 
 WIKI_API = "https://commons.wikimedia.org/w/api.php"
+SEARCH_LIMIT = 5
+MAX_DOWNLOAD_BYTES = 25 * 1024 * 1024
+MIN_WIDTH = 800  # narrower originals look blurry in the 824px column
+CHUNK_SIZE = 256 * 1024
 
+# MIME types we embed, with the extension the local copy gets
+IMAGE_MIME_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
 
-def http_json(url: str) -> dict:
-    req = urllib.request.Request(url, headers={"User-Agent": "openclaw-pm-fieldnotes/1.0"})
-    with urllib.request.urlopen(req, timeout=30) as r:
+
+def http_json(url: str, session: HttpSession) -> dict:
+    with session.open("GET", url) as r:
         return json.load(r)
 
 
+def search_commons(keywords: list[str], cache: CommonsCache | None, session: HttpSession,
+                   *, limit: int = SEARCH_LIMIT) -> dict:
+    """Commons file search for keywords, served from cache when possible."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "generator": "search",
+        "gsrsearch": " ".join(keywords),
+        "gsrnamespace": "6",  # File:
+        "gsrlimit": str(limit),
+        "prop": "imageinfo",
+        "iiprop": "url|size|mime|extmetadata",
+        # Avoid thumbnail generation (Commons can rate-limit thumb requests).
+    }
+    key = f"{normalize_query(keywords)}|limit={limit}|iiprop={params['iiprop']}"
+    if cache is not None:
+        data = cache.get_search(key)
+        if data is not None:
+            return data
+    try:
+        data = http_json(WIKI_API + "?" + urllib.parse.urlencode(params), session)
+    except Exception:
+        # rate-limited / offline: an expired answer beats no image
+        stale = cache.get_search(key, allow_stale=True) if cache is not None else None
+        if stale is None:
+            raise
+        return stale
+    if cache is not None:
+        cache.put_search(key, data)
+    return data
+
+
+def _probe(session: HttpSession, cand: dict) -> dict:
+    """HEAD one candidate; the server's Content-Length/Type beat API metadata."""
+    try:
+        with session.open("HEAD", cand["url"], timeout=15) as r:
+            r.read()
+            length = r.getheader("Content-Length")
+            mime = (r.getheader("Content-Type") or "").split(";")[0].strip().lower()
+    except Exception as e:
+        return dict(cand, probe_error=str(e))
+    if length and length.isdigit():
+        cand = dict(cand, bytes=int(length))
+    if mime:
+        cand = dict(cand, mime=mime)
+    return cand
+
+
+def probe_candidates(pages: dict, session: HttpSession,
+                     cache: CommonsCache | None = None) -> list[dict]:
+    """Candidate files from a search response, sizes/types checked concurrently.
+
+    Candidates with a cached probe answer are not requested again."""
+    cands = []
+    for _pid, page in sorted(pages.items(), key=lambda kv: kv[1].get("index", 0)):
+        iis = page.get("imageinfo") or []
+        if not iis or not iis[0].get("url"):
+            continue
+        ii = iis[0]
+        cands.append({
+            "page": page, "ii": ii, "url": ii["url"],
+            "bytes": ii.get("size"), "mime": (ii.get("mime") or "").lower(),
+            "width": ii.get("width") or 0, "height": ii.get("height") or 0,
+        })
+    todo = []
+    for i, cand in enumerate(cands):
+        known = cache.get_probe(cand["url"]) if cache is not None else None
+        if known is None:
+            todo.append(i)
+        else:
+            cands[i] = dict(cand, bytes=known["bytes"] or cand["bytes"], mime=known["mime"] or cand["mime"])
+    if not todo:
+        return cands
+    with ThreadPoolExecutor(max_workers=len(todo)) as ex:
+        probed = list(ex.map(lambda i: _probe(session, cands[i]), todo))
+    for i, cand in zip(todo, probed):
+        cands[i] = cand
+    if cache is not None:
+        cache.put_probes({c["url"]: {"bytes": c["bytes"], "mime": c["mime"]}
+                          for c in probed if "probe_error" not in c})
+    return cands
+
+
+def pick_candidate(cands: list[dict], *, max_bytes: int = MAX_DOWNLOAD_BYTES,
+                   min_width: int = MIN_WIDTH) -> dict | None:
+    """Smallest acceptable candidate.
+
+    Acceptable = an image MIME type we embed and at most max_bytes. Among
+    those, the smallest file at least min_width wide wins; if none is wide
+    enough, the widest acceptable one does.
+    """
+    ok = [c for c in cands
+          if c["mime"] in IMAGE_MIME_EXT and c["bytes"] is not None and c["bytes"] <= max_bytes]
+    if not ok:
+        return None
+    wide = [c for c in ok if c["width"] >= min_width]
+    if wide:
+        return min(wide, key=lambda c: c["bytes"])
+    return max(ok, key=lambda c: (c["width"], -c["bytes"]))
+
+
+class DownloadTooLarge(Exception):
+    pass
+
+
+def stream_download(url: str, dest: Path, session: HttpSession, *,
+                    max_bytes: int = MAX_DOWNLOAD_BYTES, timeout: float = 60) -> dict:
+    """Stream url into dest in fixed-size chunks with constant memory.
+
+    Writes to a temp file next to dest and renames it into place only once the
+    body is complete, so a failed or oversized download never leaves a
+    truncated file behind. Aborts before reading the body when Content-Length
+    already exceeds max_bytes. Returns {"bytes", "seconds", "bytes_per_s"}.
+    """
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.part")
+    t0 = time.monotonic()
+    n = 0
+    try:
+        with session.open("GET", url, timeout=timeout) as r:
+            length = r.getheader("Content-Length")
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise DownloadTooLarge(f"{url}: Content-Length {length} > {max_bytes}")
+            with open(tmp, "wb") as f:
+                while True:
+                    chunk = r.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    n += len(chunk)
+                    if n > max_bytes:
+                        raise DownloadTooLarge(f"{url}: body exceeds {max_bytes} bytes")
+                    f.write(chunk)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    secs = max(time.monotonic() - t0, 1e-9)
+    return {"bytes": n, "seconds": round(secs, 3), "bytes_per_s": int(n / secs)}
+
+
+def fetch_file(img_url: str, local_path: Path, cache: CommonsCache | None,
+               session: HttpSession, *, max_bytes: int = MAX_DOWNLOAD_BYTES) -> dict:
+    """Download img_url to local_path, reusing a cached copy of the same URL.
+
+    Returns download stats ({"bytes", "seconds", "bytes_per_s", "cached"}).
+    """
+    blob = cache.get_file(img_url) if cache is not None else None
+    if blob is not None:
+        if blob.stat().st_size > max_bytes:
+            raise DownloadTooLarge(f"{img_url}: cached copy exceeds {max_bytes} bytes")
+        shutil.copyfile(blob, local_path)
+        return {"bytes": local_path.stat().st_size, "seconds": 0.0, "bytes_per_s": 0, "cached": True}
+    if cache is None:
+        return dict(stream_download(img_url, local_path, session, max_bytes=max_bytes), cached=False)
+    tmp = cache.root / "blobs" / f".{local_path.name}.download"
+    stats = stream_download(img_url, tmp, session, max_bytes=max_bytes)
+    blob = cache.put_file(img_url, tmp, local_path.suffix)
+    shutil.copyfile(blob, local_path)
+    return dict(stats, cached=False)
+
+
 def sanitize_filename(name: str) -> str:
     name = re.sub(r"[^a-zA-Z0-9._-]+", "-", name).strip("-")
     return name or "image"
 
 
-def main() -> int:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--slug", required=True)
-    ap.add_argument("--keywords", required=True, help="comma-separated")
-    args = ap.parse_args()
+class ImageFetchError(Exception):
+    """No image could be fetched (no results, nothing acceptable, download failed)."""
+
+
+def default_cache(cache_dir: str | Path = CACHE_DIR, *, ttl_days: float = 7,
+                  max_mb: int = DEFAULT_MAX_BYTES // (1024 * 1024)) -> CommonsCache:
+    return CommonsCache(cache_dir, search_ttl=ttl_days * DAY, max_bytes=max_mb * 1024 * 1024)
+
+
+def fetch_image(slug: str, keywords, *, cache: CommonsCache | None = None,
+                session: HttpSession | None = None, out_dir: Path = OUT_DIR,
+                candidates: int = SEARCH_LIMIT, min_width: int = MIN_WIDTH,
+                max_bytes: int = MAX_DOWNLOAD_BYTES) -> dict:
+    """Find a Commons image for keywords and store it as out_dir/<slug>.<ext>.
 
-    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
+    keywords: list of terms or a comma-separated string. Pass a shared cache
+    and session when fetching several images in one process.
+
+    Returns the same dict the CLI prints as JSON. Raises ImageFetchError.
+    """
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    keywords = [k.strip() for k in keywords if k.strip()]
     if not keywords:
-        raise SystemExit("no keywords")
+        raise ImageFetchError("no keywords")
+    own_session = session is None
+    session = session or HttpSession()
+    try:
+        return _fetch_image(slug, keywords, cache, session, out_dir,
+                            candidates=candidates, min_width=min_width, max_bytes=max_bytes)
+    finally:
+        if own_session:
+            session.close()
+
 
+def _fetch_image(slug: str, keywords: list[str], cache: CommonsCache | None,
+                 session: HttpSession, out_dir: Path, *, candidates: int,
+                 min_width: int, max_bytes: int) -> dict:
     query = " ".join(keywords)
 
     # Search for files
-    params = {
-        "action": "query",
-        "format": "json",
-        "generator": "search",
-        "gsrsearch": query,
-        "gsrnamespace": "6",  # File:
-        "gsrlimit": "5",
-        "prop": "imageinfo",
-        "iiprop": "url|extmetadata",
-        # Avoid thumbnail generation (Commons can rate-limit thumb requests).
-    }
-    url = WIKI_API + "?" + urllib.parse.urlencode(params)
-    data = http_json(url)
+    try:
+        data = search_commons(keywords, cache, session, limit=candidates)
+    except Exception as e:
+        raise ImageFetchError(f"search failed: {e}") from e
 
     pages = (data.get("query") or {}).get("pages") or {}
     if not pages:
-        raise SystemExit("no results")
-
-    # Pick first page with a downloadable image URL
-    picked = None
-    for _pid, page in pages.items():
-        iis = page.get("imageinfo") or []
-        if not iis:
-            continue
-        ii = iis[0]
-        img_url = ii.get("thumburl") or ii.get("url")
-        if not img_url:
-            continue
-        picked = (page, ii)
-        break
+        raise ImageFetchError("no results")
 
+    # Smallest candidate that is a real image within the budget
+    picked = pick_candidate(probe_candidates(pages, session, cache),
+                            max_bytes=max_bytes, min_width=min_width)
     if not picked:
-        raise SystemExit("no usable image")
+        raise ImageFetchError("no usable image")
 
-    page, ii = picked
+    page, ii = picked["page"], picked["ii"]
 
     extmeta = (ii.get("extmetadata") or {})
     artist = (extmeta.get("Artist") or {}).get("value") or "Unknown"
@@ -100,28 +298,21 @@ def main() -> int:
     source_url = "https://commons.wikimedia.org/wiki/" + urllib.parse.quote(title.replace(" ", "_"))
 
     # Prefer original file URL to avoid thumbnail rate-limits.
-    img_url = ii.get("url")
-    if not img_url:
-        raise SystemExit("missing image url")
+    img_url = picked["url"]
 
-    # Determine extension from URL
-    parsed = urllib.parse.urlparse(img_url)
-    ext = os.path.splitext(parsed.path)[1].lower()
-    if ext not in (".jpg", ".jpeg", ".png", ".webp", ".gif"):
-        ext = ".jpg"
+    # Extension follows the served MIME type (a .pdf URL must not become .jpg)
+    ext = IMAGE_MIME_EXT[picked["mime"]]
 
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
-    local_name = sanitize_filename(args.slug) + ext
-    local_path = OUT_DIR / local_name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    local_name = sanitize_filename(slug) + ext
+    local_path = out_dir / local_name
 
     # Download (be gentle with rate limits)
-    req = urllib.request.Request(img_url, headers={"User-Agent": "openclaw-pm-fieldnotes/1.0"})
     try:
-        with urllib.request.urlopen(req, timeout=60) as r:
-            local_path.write_bytes(r.read())
+        download = fetch_file(img_url, local_path, cache, session, max_bytes=max_bytes)
     except Exception as e:
         # If Commons rate-limits, skip image instead of failing publish.
-        raise SystemExit(f"download failed: {e}")
+        raise ImageFetchError(f"download failed: {e}") from e
 
     rel_path = f"assets/images/{local_name}"
 
@@ -137,13 +328,42 @@ def main() -> int:
         if credit_clean and credit_clean.lower() not in ("unknown",):
             credit_line += f" · {credit_clean}"
 
-    out = {
+    return {
         "local_path": str(local_path),
         "img_html": img_html,
         "credit": credit_line,
         "source_url": source_url,
         "license": license_short,
+        "download": download,
+        "width": picked["width"],
+        "height": picked["height"],
     }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slug", required=True)
+    ap.add_argument("--keywords", required=True, help="comma-separated")
+    ap.add_argument("--cache-dir", default=str(CACHE_DIR))
+    ap.add_argument("--no-cache", action="store_true", help="always query and download from Commons")
+    ap.add_argument("--cache-ttl-days", type=float, default=7, help="search response lifetime")
+    ap.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    ap.add_argument("--max-download-mb", type=float, default=MAX_DOWNLOAD_BYTES / (1024 * 1024),
+                    help="refuse originals larger than this")
+    ap.add_argument("--candidates", type=int, default=SEARCH_LIMIT, help="search results to compare")
+    ap.add_argument("--min-width", type=int, default=MIN_WIDTH,
+                    help="prefer the smallest file at least this wide")
+    args = ap.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = default_cache(args.cache_dir, ttl_days=args.cache_ttl_days, max_mb=args.cache_max_mb)
+    try:
+        out = fetch_image(args.slug, args.keywords, cache=cache,
+                          candidates=args.candidates, min_width=args.min_width,
+                          max_bytes=int(args.max_download_mb * 1024 * 1024))
+    except ImageFetchError as e:
+        raise SystemExit(str(e))
     sys.stdout.write(json.dumps(out, ensure_ascii=False))
     return 0
 
@@ -5,100 +5,314 @@
 - Renders static HTML into /docs
 - Commits + pushes to GitHub via deploy key.
 
+Image fetching (commons_image.fetch_image) and the site build
+(generate.build_site) run in this process; only git is a subprocess.
+
 This script is designed to be called from an OpenClaw cron agentTurn that supplies the markdown content.
 
 Usage:
   python3 scripts/daily_publish.py --slug 2026-02-20-some-title --title "..." --body-path /tmp/body.md
 
 It writes: posts/<slug>.md and rebuilds docs.
+
+Batch mode (backfills, several posts per run) fetches all images
+concurrently, writes every post, then rebuilds, commits and pushes once:
+  python3 scripts/daily_publish.py --batch posts.jsonl
+  python3 scripts/daily_publish.py --batch /tmp/bodies/
+
+  JSONL: one {"slug", "title", "body_path" | "body", "image_keywords"?} per line
+  (a relative body_path is relative to the JSONL file).
+  Directory: <slug>.md files whose first line is "# <title>", plus an
+  optional <slug>.keywords file with comma-separated image keywords.
+
+A JSON summary {"published": [...], "failed": [{"slug", "error"}]} is printed
+at the end of a batch; the exit status is 1 if anything failed.
+
+Only the outputs the build reported are staged. Outputs of a publish whose
+commit or push failed are remembered in .cache/publish/pending.json and
+staged by the next run; --recover additionally sweeps docs/ with git status.
 """
 
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import generate
+from commons_image import default_cache, fetch_image
+from http_session import HttpSession
+
 REPO_DIR = Path(__file__).resolve().parents[1]
 KEY_PATH = Path("/home/node/.openclaw/keys/pm-fieldnotes_deploy_key")
 KNOWN_HOSTS = Path("/home/node/.openclaw/ssh/known_hosts")
+IMAGE_WORKERS = 4  # concurrent Commons fetches in --batch mode
+# outputs staged by a publish that has not been pushed yet (see stage_build)
+PENDING_PATH = REPO_DIR / ".cache" / "publish" / "pending.json"
 
 
 def run(cmd: list[str], *, check: bool = True) -> None:
     subprocess.run(cmd, cwd=str(REPO_DIR), check=check)
 
 
+def load_batch(path: Path) -> list[dict]:
+    """Post specs from a JSONL manifest or a directory of <slug>.md bodies."""
+    specs = []
+    if path.is_dir():
+        for md in sorted(path.glob("*.md")):
+            text = md.read_text(encoding="utf-8")
+            first, _, rest = text.partition("\n")
+            kw = md.with_suffix(".keywords")
+            specs.append({
+                "slug": md.stem,
+                "title": first[2:].strip() if first.startswith("# ") else "",
+                "body": rest,
+                "image_keywords": kw.read_text(encoding="utf-8").strip() if kw.exists() else "",
+            })
+        return specs
+    for n, line in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+        except ValueError as e:
+            spec = {"slug": f"<line {n}>", "error": f"bad JSON: {e}"}
+        if not isinstance(spec, dict):
+            spec = {"slug": f"<line {n}>", "error": "not a JSON object"}
+        if isinstance(spec.get("body_path"), str) and spec["body_path"]:
+            # relative to the manifest, wherever the publisher runs from
+            spec["body_path"] = str(path.parent / spec["body_path"])
+        specs.append(spec)
+    return specs
+
+
+def check_spec(spec: dict, posts_dir: Path) -> str:
+    """Problem with a post spec, or '' if it can be published."""
+    if spec.get("error"):
+        return spec["error"]
+    slug = (spec.get("slug") or "").strip()
+    if not slug or "/" in slug or slug.startswith("."):
+        return "invalid slug"
+    if not (spec.get("title") or "").strip():
+        return "missing title"
+    if "body" not in spec and not spec.get("body_path"):
+        return "missing body or body_path"
+    if (posts_dir / f"{slug}.md").exists():
+        return f"post already exists: {posts_dir / f'{slug}.md'}"
+    return ""
+
+
+def image_blocks(slug: str, keywords: str, cache, session) -> tuple[str, str, str | None]:
+    """(img_block, credit_block, downloaded image path) for a post; never raises."""
+    if not keywords.strip():
+        return "", "", None
+    # Fetch Commons image and embed as raw HTML line (generator keeps <img> as-is)
+    try:
+        meta = fetch_image(slug, keywords, cache=cache, session=session)
+    except Exception:
+        # Don't block publishing if image fetch fails (rate-limit etc.)
+        return "", "\n\n---\n\nImage credit: (skipped — Commons rate-limit or fetch error)\n", None
+    img_block = meta.get("img_html", "").strip() + "\n\n"
+    credit = meta.get("credit", "").strip()
+    return img_block, ("\n\n---\n\n" + credit + "\n" if credit else ""), meta.get("local_path")
+
+
+def write_post(spec: dict, posts_dir: Path, img_block: str, credit_block: str) -> Path:
+    body = spec["body"] if "body" in spec else Path(spec["body_path"]).read_text(encoding="utf-8")
+    body = body.strip() + "\n"
+    md = f"# {spec['title'].strip()}\n\n" + img_block + body + credit_block
+    out_path = posts_dir / f"{spec['slug']}.md"
+    with open(out_path, "x", encoding="utf-8") as f:  # never overwrite a published post
+        f.write(md)
+    return out_path
+
+
+def stage(paths, deleted=()) -> None:
+    """Stage exactly these repo-relative paths instead of `git add -A`
+    (which stats the whole tree). Deleted paths are staged as removals."""
+    def _git(cmd: list[str], items) -> None:
+        if items:
+            subprocess.run(cmd + ["--pathspec-from-file=-", "--pathspec-file-nul"], cwd=str(REPO_DIR),
+                           input="\0".join(sorted(items)).encode("utf-8"), check=True)
+
+    _git(["git", "add"], set(map(str, paths)))
+    _git(["git", "rm", "--cached", "--quiet", "--ignore-unmatch"], set(map(str, deleted)))
+
+
+def docs_status() -> tuple[list[str], list[str]]:
+    """(modified or untracked paths, deleted paths) under docs/, from git.
+
+    Stats every file under docs/, so it only runs for --recover (e.g. after
+    a manual generate.py run whose outputs the manifest now treats as current).
+    """
+    out = subprocess.run(["git", "status", "--porcelain", "-z", "--untracked-files=all", "--", "docs"],
+                         cwd=str(REPO_DIR), check=True, capture_output=True).stdout.decode("utf-8")
+    changed, deleted = [], []
+    fields = iter(out.split("\0"))
+    for entry in fields:
+        if not entry:
+            continue
+        xy, path = entry[:2], entry[3:]
+        if "R" in xy or "C" in xy:
+            next(fields, None)  # rename/copy source
+        (deleted if "D" in xy else changed).append(path)
+    return changed, deleted
+
+
+def stage_build(sources, build: dict, *, recover: bool = False) -> None:
+    """Stage the publisher's own source files and the outputs build_site reported.
+
+    The staged list is saved to PENDING_PATH until commit_and_push succeeds,
+    so outputs of a publish whose commit or push failed (which the build
+    manifest already treats as current) are staged again by the next one.
+    recover: also sweep docs/ with git status.
+    """
+    paths = {*map(str, sources), *build["created"], *build["changed"]}
+    deleted = set(build["deleted"])
+    try:
+        pending = json.loads(PENDING_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        pending = {}
+    for p in [*pending.get("paths", []), *pending.get("deleted", [])]:
+        (paths if (REPO_DIR / p).exists() else deleted).add(p)
+    if recover:
+        changed, gone = docs_status()
+        paths.update(changed)
+        deleted.update(gone)
+    deleted -= paths
+    PENDING_PATH.parent.mkdir(parents=True, exist_ok=True)
+    PENDING_PATH.write_text(json.dumps({"paths": sorted(paths), "deleted": sorted(deleted)}), encoding="utf-8")
+    stage(paths, deleted)
+
+
+def commit_and_push(message: str) -> None:
+    run(["git", "config", "user.email", "openclaw-bot@local"])
+    run(["git", "config", "user.name", "OpenClaw"])
+
+    # allow empty body changes? no.
+    run(["git", "commit", "-m", message])
+
+    env = os.environ.copy()
+    env["GIT_SSH_COMMAND"] = (
+        f"ssh -i {KEY_PATH} -o IdentitiesOnly=yes -o UserKnownHostsFile={KNOWN_HOSTS} -o StrictHostKeyChecking=yes"
+    )
+    subprocess.run(["git", "push", "origin", "main"], cwd=str(REPO_DIR), check=True, env=env)
+    PENDING_PATH.unlink(missing_ok=True)
+
+
+def publish_batch(specs: list[dict], cfg: dict, *, recover: bool = False) -> dict:
+    """Publish many posts with one image pass, one rebuild, one commit and push."""
+    posts_dir = REPO_DIR / "posts"
+    posts_dir.mkdir(parents=True, exist_ok=True)
+
+    failed = []
+    ok = []
+    seen = set()
+    for spec in specs:
+        err = check_spec(spec, posts_dir)
+        if not err and spec["slug"] in seen:
+            err = "duplicate slug in batch"
+        if err:
+            failed.append({"slug": spec.get("slug", ""), "error": err})
+            continue
+        seen.add(spec["slug"])
+        ok.append(spec)
+
+    cache = default_cache()
+    session = HttpSession()
+    try:
+        with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as ex:
+            fetched = list(ex.map(
+                lambda sp: image_blocks(sp["slug"], sp.get("image_keywords") or "", cache, session), ok))
+    finally:
+        session.close()
+
+    written = []
+    sources = []
+    for spec, (img_block, credit_block, image) in zip(ok, fetched):
+        try:
+            written.append(write_post(spec, posts_dir, img_block, credit_block))
+            sources += [f"posts/{spec['slug']}.md"] + ([image] if image else [])
+        except OSError as e:
+            failed.append({"slug": spec["slug"], "error": str(e)})
+
+    published = [p.stem for p in written]
+    if not published:
+        return {"published": [], "failed": failed}
+
+    if len(published) == 1:
+        message = f"post: {published[0]}"
+    else:
+        message = f"posts: {len(published)} ({published[0]} .. {published[-1]})\n\n" + "\n".join(published)
+    step = "build"
+    try:
+        # render site once (only the new posts need reading)
+        build = generate.build_site(cfg, changed=[f"posts/{p.name}" for p in written])
+        step = "commit/push"
+        stage_build(sources, build, recover=recover)
+        commit_and_push(message)
+    except Exception as e:
+        # posts are on disk (maybe committed) but not live: report them as failed
+        failed.extend({"slug": slug, "error": f"{step} failed: {e}"} for slug in published)
+        published = []
+    return {"published": published, "failed": failed}
+
+
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--slug", required=True, help="filename slug without extension")
-    ap.add_argument("--title", required=True)
-    ap.add_argument("--body-path", required=True, help="path to markdown body (without leading # title)")
+    ap.add_argument("--slug", help="filename slug without extension")
+    ap.add_argument("--title")
+    ap.add_argument("--body-path", help="path to markdown body (without leading # title)")
     ap.add_argument(
         "--image-keywords",
         default="",
         help="comma-separated keywords for Wikimedia Commons image (no API key)",
     )
+    ap.add_argument("--batch", help="JSONL manifest or directory of <slug>.md bodies to publish together")
+    ap.add_argument("--recover", action="store_true",
+                    help="also stage every unstaged change under docs/ (after a manual generate.py run)")
     args = ap.parse_args()
 
-    posts_dir = REPO_DIR / "posts"
-    posts_dir.mkdir(parents=True, exist_ok=True)
+    if args.batch and (args.slug or args.title or args.body_path):
+        ap.error("--batch cannot be combined with --slug/--title/--body-path")
+    if not args.batch and not (args.slug and args.title and args.body_path):
+        ap.error("--slug, --title and --body-path are required (or use --batch)")
 
-    body = Path(args.body_path).read_text(encoding="utf-8").strip() + "\n"
+    # caller paths are relative to the invocation cwd, not the repo
+    if args.body_path:
+        args.body_path = os.path.abspath(args.body_path)
+    if args.batch:
+        args.batch = os.path.abspath(args.batch)
 
-    img_block = ""
-    credit_block = ""
-    if args.image_keywords.strip():
-        # Fetch Commons image and embed as raw HTML line (generator keeps <img> as-is)
-        import json as _json
-        import subprocess as _sub
+    # generate.py works with repo-relative paths
+    os.chdir(REPO_DIR)
+    cfg = generate.load_cfg()
 
-        try:
-            r = _sub.check_output(
-                [
-                    "python3",
-                    "scripts/commons_image.py",
-                    "--slug",
-                    args.slug,
-                    "--keywords",
-                    args.image_keywords,
-                ],
-                cwd=str(REPO_DIR),
-                stderr=_sub.STDOUT,
-            )
-            meta = _json.loads(r.decode("utf-8"))
-            img_block = meta.get("img_html", "").strip() + "\n\n"
-            credit = meta.get("credit", "").strip()
-            if credit:
-                credit_block = "\n\n---\n\n" + credit + "\n"
-        except Exception as e:
-            # Don't block publishing if image fetch fails (rate-limit etc.)
-            img_block = ""
-            credit_block = "\n\n---\n\nImage credit: (skipped — Commons rate-limit or fetch error)\n"
-
-    md = f"# {args.title}\n\n" + img_block + body + credit_block
+    if args.batch:
+        summary = publish_batch(load_batch(Path(args.batch)), cfg, recover=args.recover)
+        print(json.dumps(summary, ensure_ascii=False, indent=1))
+        return 1 if summary["failed"] else 0
 
+    posts_dir = REPO_DIR / "posts"
+    posts_dir.mkdir(parents=True, exist_ok=True)
     out_path = posts_dir / f"{args.slug}.md"
     if out_path.exists():
         raise SystemExit(f"post already exists: {out_path}")
-    out_path.write_text(md, encoding="utf-8")
 
-    # render site
-    run(["python3", "scripts/generate.py"])
+    img_block, credit_block, image = image_blocks(args.slug, args.image_keywords, default_cache(), None)
+    spec = {"slug": args.slug, "title": args.title, "body_path": args.body_path}
+    write_post(spec, posts_dir, img_block, credit_block)
 
-    # git commit/push
-    run(["git", "add", "-A"])
-    run(["git", "config", "user.email", "openclaw-bot@local"])
-    run(["git", "config", "user.name", "OpenClaw"])
+    # render site (only the new post needs reading; the rest is in the build manifest)
+    source = f"posts/{args.slug}.md"
+    build = generate.build_site(cfg, changed=[source])
 
-    # allow empty body changes? no.
-    run(["git", "commit", "-m", f"post: {args.slug}"])
-
-    env = os.environ.copy()
-    env["GIT_SSH_COMMAND"] = (
-        f"ssh -i {KEY_PATH} -o IdentitiesOnly=yes -o UserKnownHostsFile={KNOWN_HOSTS} -o StrictHostKeyChecking=yes"
-    )
-    subprocess.run(["git", "push", "origin", "main"], cwd=str(REPO_DIR), check=True, env=env)
+    # stage only what this run touched
+    stage_build([source] + ([image] if image else []), build, recover=args.recover)
+    commit_and_push(f"post: {args.slug}")
 
     print(f"published {args.slug}")
     return 0
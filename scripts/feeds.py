@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""RSS 2.0, Atom and JSON Feed output for every section of the site.
+
+Each section (posts, briefs, games, catalog) gets, under docs/feeds/<section>/:
+
+  rss.xml, atom.xml, feed.json   subscription documents: the newest
+                                 SUBSCRIPTION_SIZE entries
+  archive/<k>.xml, <k>.json      RFC 5005 archive documents (Atom + JSON Feed)
+
+Archive pages are numbered from the oldest entry and hold page_size entries
+each; only complete pages are archived, so a new entry rewrites at most the
+previous last archive document (it gains a next-archive link when the new
+entry completes a page); other archives change only when their own entries
+are edited or removed. Subscription documents link to the newest archive
+(rel="prev-archive"; next_url in JSON Feed) and archives chain to each
+other. Entries past the last complete page but older than the subscription
+window are in neither until their page completes: with the catalog's
+500-entry pages that is up to 449 entries, which a poller has already seen
+in the subscription and a backfilling reader gets once archived.
+
+All three formats are rendered from the same FeedEntry rows, and
+every timestamp is derived from content (entry dates and the sitemap's
+lastmod), never from the clock: an unchanged feed is byte-identical, so
+static hosting serves the same ETag and pollers get 304s.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import functools
+import json
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+from xml.sax.saxutils import escape, quoteattr
+
+SUBSCRIPTION_SIZE = 50
+PAGE_SIZE = 50
+# part of the build keys of feed documents; bump when their markup changes
+FEED_VERSION = 3
+_FH = 'http://purl.org/syndication/history/1.0'
+
+
+class FeedEntry(NamedTuple):
+    id: str
+    title: str
+    link: str
+    summary: str
+    published: str  # YYYY-MM-DD ('' if unknown)
+    updated: str    # YYYY-MM-DD ('' = published)
+
+
+def _when(date: str, tz) -> dt.datetime | None:
+    try:
+        return dt.datetime.combine(dt.date.fromisoformat(date[:10]), dt.time(), tz)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _rfc3339(date: str, tz) -> str:
+    when = _when(date, tz) or dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    return when.isoformat()
+
+
+def _updated(e: FeedEntry) -> str:
+    return max(e.updated, e.published)
+
+
+class Feed:
+    """One section's feed metadata; renders documents for slices of entries."""
+
+    def __init__(self, section: str, title: str, description: str, home: str, *,
+                 base: str, language: str, tz):
+        self.section = section
+        self.title = title
+        self.description = description
+        self.home = home
+        self.base = base
+        self.language = language
+        self.tz = tz
+
+    def url(self, rel: str) -> str:
+        """Absolute URL of rel (relative to the section's feed directory,
+        or to the site root when it starts with '/')."""
+        if rel.startswith('/'):
+            return self.base + rel
+        return f'{self.base}/feeds/{self.section}/{rel}'
+
+    def _doc_updated(self, entries: list) -> str:
+        return max((_updated(e) for e in entries), default='')
+
+    # -- Atom ----------------------------------------------------------------
+
+    def atom(self, entries: list, self_rel: str, links: dict, *, archive: bool = False) -> str:
+        """entries newest first; links: {rel: feed-relative href} (RFC 5005 rels)."""
+        out = ['<?xml version="1.0" encoding="utf-8"?>\n',
+               f'<feed xmlns="http://www.w3.org/2005/Atom" xmlns:fh="{_FH}" xml:lang={quoteattr(self.language)}>\n',
+               f'  <id>{escape(self.url(self_rel))}</id>\n',
+               f'  <title>{escape(self.title)}</title>\n',
+               f'  <subtitle>{escape(self.description)}</subtitle>\n',
+               f'  <updated>{_rfc3339(self._doc_updated(entries), self.tz)}</updated>\n',
+               f'  <link rel="self" type="application/atom+xml" href={quoteattr(self.url(self_rel))}/>\n',
+               f'  <link rel="alternate" type="text/html" href={quoteattr(self.home)}/>\n']
+        for rel, href in links.items():
+            out.append(f'  <link rel="{rel}" type="application/atom+xml" href={quoteattr(self.url(href))}/>\n')
+        if archive:
+            out.append('  <fh:archive/>\n')
+        for e in entries:
+            out.append('  <entry>\n'
+                       f'    <id>{escape(e.id)}</id>\n'
+                       f'    <title>{escape(e.title)}</title>\n'
+                       f'    <link rel="alternate" href={quoteattr(e.link)}/>\n'
+                       f'    <published>{_rfc3339(e.published or _updated(e), self.tz)}</published>\n'
+                       f'    <updated>{_rfc3339(_updated(e), self.tz)}</updated>\n'
+                       f'    <summary>{escape(e.summary)}</summary>\n'
+                       '  </entry>\n')
+        out.append('</feed>\n')
+        return ''.join(out)
+
+    # -- RSS 2.0 -------------------------------------------------------------
+
+    def rss(self, entries: list, self_rel: str, links: dict) -> str:
+        """Subscription document only; archive links point at the Atom archives."""
+        out = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+               '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n',
+               f'  <title>{escape(self.title)}</title>\n',
+               f'  <link>{escape(self.home)}</link>\n',
+               f'  <description>{escape(self.description)}</description>\n',
+               f'  <language>{escape(self.language)}</language>\n']
+        updated = _when(self._doc_updated(entries), self.tz)
+        if updated:
+            out.append(f'  <lastBuildDate>{email.utils.format_datetime(updated)}</lastBuildDate>\n')
+        out.append(f'  <atom:link rel="self" type="application/rss+xml" href={quoteattr(self.url(self_rel))}/>\n')
+        for rel, href in links.items():
+            out.append(f'  <atom:link rel="{rel}" type="application/atom+xml" href={quoteattr(self.url(href))}/>\n')
+        for e in entries:
+            out.append('  <item>\n'
+                       f'    <title>{escape(e.title)}</title>\n'
+                       f'    <link>{escape(e.link)}</link>\n'
+                       f'    <guid isPermaLink="{"true" if e.id == e.link else "false"}">{escape(e.id)}</guid>\n')
+            when = _when(e.published, self.tz)
+            if when:
+                out.append(f'    <pubDate>{email.utils.format_datetime(when)}</pubDate>\n')
+            out.append(f'    <description>{escape(e.summary)}</description>\n'
+                       '  </item>\n')
+        out.append('</channel>\n</rss>\n')
+        return ''.join(out)
+
+    # -- JSON Feed 1.1 ---------------------------------------------------------
+
+    def json_feed(self, entries: list, self_rel: str, next_rel: str | None) -> str:
+        doc = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.title,
+            'home_page_url': self.home,
+            'feed_url': self.url(self_rel),
+            'description': self.description,
+            'language': self.language,
+        }
+        if next_rel:
+            doc['next_url'] = self.url(next_rel)
+        doc['items'] = [
+            {'id': e.id, 'url': e.link, 'title': e.title, 'summary': e.summary,
+             'date_published': _rfc3339(e.published or _updated(e), self.tz),
+             'date_modified': _rfc3339(_updated(e), self.tz)}
+            for e in entries]
+        return json.dumps(doc, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def write_feeds(feed: Feed, rows, count: int, out: Path, changes, *, page_size: int = PAGE_SIZE,
+                first_page: int = 1, rss_alias: str | None = None) -> None:
+    """Write one section's subscription and archive documents.
+
+    rows(offset): FeedEntry rows oldest first, starting at position offset
+    (a generator is fine; at most one archive page is held at a time).
+    count: total number of entries. Archive pages before first_page are
+    trusted as already written and not rendered. Files whose bytes are
+    unchanged are left alone; archive pages that no longer exist are removed.
+    rss_alias: extra site-relative path that also gets the RSS document
+    (kept for subscribers of an older feed URL).
+    """
+    root = out/'feeds'/feed.section
+    (root/'archive').mkdir(parents=True, exist_ok=True)
+    pages = count // page_size  # complete pages only
+    skip_to = min(first_page - 1, pages) * page_size
+    # the subscription documents show the newest SUBSCRIPTION_SIZE entries
+    start = min(skip_to, max(count - SUBSCRIPTION_SIZE, 0))
+    it = iter(rows(start))
+    tail = deque(islice(it, skip_to - start), maxlen=SUBSCRIPTION_SIZE)
+
+    for k in range(skip_to // page_size + 1, pages + 1):
+        chunk = list(islice(it, page_size))
+        tail.extend(chunk)
+        chunk.reverse()
+        links = {'current': 'atom.xml'}
+        if k > 1:
+            links['prev-archive'] = f'archive/{k - 1}.xml'
+        if k < pages:
+            links['next-archive'] = f'archive/{k + 1}.xml'
+        changes.write(root/'archive'/f'{k}.xml', feed.atom(chunk, f'archive/{k}.xml', links, archive=True))
+        changes.write(root/'archive'/f'{k}.json',
+                      feed.json_feed(chunk, f'archive/{k}.json', f'archive/{k - 1}.json' if k > 1 else None))
+
+    tail.extend(it)
+    newest = list(tail)[::-1]
+    prev = {'prev-archive': f'archive/{pages}.xml'} if pages else {}
+    changes.write(root/'atom.xml', feed.atom(newest, 'atom.xml', dict(current='atom.xml', **prev)))
+    changes.write(root/'rss.xml', feed.rss(newest, 'rss.xml', dict(current='atom.xml', **prev)))
+    if rss_alias:
+        changes.write(out/rss_alias, feed.rss(newest, '/' + rss_alias, dict(current='atom.xml', **prev)))
+    changes.write(root/'feed.json', feed.json_feed(newest, 'feed.json', f'archive/{pages}.json' if pages else None))
+
+    keep = {f'{k}.{ext}' for k in range(1, pages + 1) for ext in ('xml', 'json')}
+    for path in sorted((root/'archive').iterdir()):
+        if path.name not in keep:
+            changes.remove(path)
@@ -1,7 +1,30 @@
 #!/usr/bin/env python3
 import os, json, glob, re
+import datetime as dt
+import argparse
+import functools
+from html import escape as _html_escape
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from brief_ingest import brief_sources, brief_title, scan_briefs
+from build_manifest import (BuildManifest, OutputChanges, sha256_bytes, sha256_file, sha256_json,
+                            sha256_text, write_if_changed)
+from catalog_facets import STOPWORDS as CATALOG_STOPWORDS, build_facets
+from catalog_io import iter_catalog_items, write_shards
+from feeds import FEED_VERSION, Feed, FeedEntry, write_feeds
+from image_variants import build_variants, referenced, responsive_img
+from meta_store import MetaStore, slug_date
+from mirror import Mirror
+from post_search import post_terms, write_search_index
+from sitemaps import build_sitemaps
+
+# Bump whenever a change here alters rendered markup, so the build manifest
+# knows previously generated pages are stale.
+RENDERER_VERSION = '12'
+MANIFEST_PATH = Path('.cache/build/manifest.json')
+META_STORE_PATH = Path('.cache/build/meta.sqlite')
+
 def load_cfg():
     return json.load(open('site/config.json','r',encoding='utf-8'))
 
@@ -85,50 +108,210 @@ small{color:var(--muted)}
 .post h2{margin:26px 0 10px; font-size:20px}
 .kbd{font-family:var(--mono); font-size:12px; padding:2px 8px; border-radius:999px; border:1px solid rgba(255,255,255,.10); background: rgba(0,0,0,.2)}
 .footer{margin-top:18px; color:var(--muted); font-size:13px}
+.pager{display:flex; justify-content:space-between; gap:12px; margin-top:14px; font-size:14px}
+.vlist{position:relative}
+.filters{display:flex; flex-wrap:wrap; gap:8px; margin-top:12px}
+.filters input,.filters select{font:inherit; font-size:14px; color:var(--text); background:rgba(0,0,0,.25); border:1px solid rgba(255,255,255,.12); border-radius:10px; padding:6px 10px}
+.filters input{flex:1 1 200px}
+.vrow{position:absolute; left:0; right:0; height:112px; padding:8px 0; overflow:hidden; border-bottom:1px solid rgba(255,255,255,.06); display:flex; flex-direction:column}
+.vrow .t{white-space:nowrap; overflow:hidden; text-overflow:ellipsis}
+.brief-body h2{margin:26px 0 10px; font-size:20px; color:var(--brand2)}
+.brief-body a{word-break:break-all}
 """.strip()
 
 
-def render_post(md_path: str, cfg: dict, *, slug: str) -> str:
+@functools.lru_cache(maxsize=None)
+def _stylesheet() -> tuple[str, str]:
+    """(file name, css) of the shared theme stylesheet.
+
+    The name carries a content hash so it can be cached forever by browsers;
+    a theme change produces a new file name (and new links on every page).
+    """
+    css = _theme_css() + "\n"
+    return f"site.{sha256_text(css)[:10]}.css", css
+
+
+def _stylesheet_link(prefix: str) -> str:
+    """<link> to the shared stylesheet; prefix is the page's path back to docs/."""
+    return f'<link rel="stylesheet" href="{prefix}assets/{_stylesheet()[0]}">'
+
+
+def write_stylesheet(out: Path, changes: OutputChanges | None = None) -> Path:
+    """Emit docs/assets/site.<hash>.css and drop stale fingerprinted copies."""
+    changes = changes if changes is not None else OutputChanges()
+    name, css = _stylesheet()
+    assets = out / 'assets'
+    assets.mkdir(parents=True, exist_ok=True)
+    for old in assets.glob('site.*.css'):
+        if old.name != name:
+            changes.remove(old)
+    path = assets / name
+    if not path.exists():
+        changes.write(path, css)
+    return path
+
+
+# Inline markdown: one left-to-right scan per line.
+#
+# Supported constructs (same set the old regex cascade handled):
+#   [text](http(s)://url)   `code`   **bold**   *italic*   [^1] footnote refs
+#
+# The scanner only stops at the three characters that can open a construct
+# and remembers where the next closing ']' / '`' / '*' is, so runs of
+# unmatched openers cost O(1) each instead of a rescan of the rest of the
+# line. Everything between constructs is HTML-escaped in one go.
+#
+# Output matches the cascade except where the cascade produced overlapping
+# tags (guarded by INTENDED_DIFFERENCES in bench_render.py):
+#   - `code` contents are literal: no bold, italic, link or footnote markup
+#     inside a code span ('`**x**`' -> <code>**x**</code>)
+#   - a span that would cross another one's boundary is not closed across
+#     it: '**a `b** c`' -> <strong>a `b</strong> c`, and a '*' inside code
+#     no longer pairs with one outside it
+_INLINE_OPENERS = re.compile(r'[\[`*]')
+_LINK_TARGET = re.compile(r'\((https?://[^\s)]+)\)')
+_FOOTNOTE_REF = re.compile(r'\[\^(\d+)\]')
+_BOLD = re.compile(r'\*\*[^*]+?\*\*')
+_FOOTNOTE_DEF = re.compile(r'\[\^(\d+)\]:\s*(.*)$')
+_ASSET_ATTR = re.compile(r'(\s(?:src|srcset)=")([^"]*)"')
+_ASSET_URL = re.compile(r'(?:(?<=^)|(?<=, ))assets/')
+
+
+class _InlineScanner:
+    __slots__ = ('s', 'out', '_next', '_link_memo', '_bold')
+
+    def __init__(self, s: str):
+        self.s = s
+        self.out: list[str] = []
+        # '**' span start -> end, chosen leftmost-first like the old cascade's
+        # bold pass so italic spans can enclose or abut bold ones
+        self._bold = {m.start(): m.end() for m in _BOLD.finditer(s)} if '**' in s else {}
+        # char -> (searched_from, found_at); found_at == len(s) when absent
+        self._next: dict[str, tuple[int, int]] = {}
+        # ']' position -> url (or None) so a run of '[' shares one target match
+        self._link_memo: dict[int, str | None] = {}
+
+    def find(self, ch: str, pos: int) -> int:
+        """Index of the first ch at or after pos (len(s) if none), amortised O(1)."""
+        cached = self._next.get(ch)
+        if cached is not None and cached[0] <= pos <= cached[1]:
+            return cached[1]
+        j = self.s.find(ch, pos)
+        if j < 0:
+            j = len(self.s)
+        self._next[ch] = (pos, j)
+        return j
+
+    def link_target(self, close: int, hi: int) -> str | None:
+        if close in self._link_memo:
+            return self._link_memo[close]
+        m = _LINK_TARGET.match(self.s, close + 1, hi)
+        url = m.group(1) if m else None
+        self._link_memo[close] = url
+        return url
+
+    def italic_close(self, i: int, hi: int) -> int:
+        """The '*' closing an italic span opened at i, skipping enclosed bold
+        spans; -1 if there is none (or it touches a stray '*')."""
+        s, j = self.s, i + 1
+        while True:
+            k = self.find('*', j)
+            if k >= hi:
+                return -1
+            end = self._bold.get(k)
+            if end is None:
+                break
+            j = end
+        if k + 1 < len(s) and s[k + 1] == '*' and k + 1 not in self._bold:
+            return -1
+        return k
+
+    def render(self, lo: int, hi: int) -> None:
+        s, out = self.s, self.out
+        i = text_start = lo
+        while True:
+            m = _INLINE_OPENERS.search(s, i, hi)
+            if m is None:
+                break
+            i = m.start()
+            c = s[i]
+            if c == '[':
+                close = self.find(']', i + 1)
+                if close < hi and close > i + 1:
+                    url = self.link_target(close, hi)
+                    if url is not None:
+                        out.append(_html_escape(s[text_start:i]))
+                        out.append(f'<a href="{_html_escape(url)}">')
+                        self.render(i + 1, close)
+                        out.append('</a>')
+                        i = text_start = close + len(url) + 3
+                        continue
+                fm = _FOOTNOTE_REF.match(s, i, hi)
+                if fm:
+                    out.append(_html_escape(s[text_start:i]))
+                    out.append(f'<sup class="fn">[{fm.group(1)}]</sup>')
+                    i = text_start = fm.end()
+                    continue
+            elif c == '`':
+                close = self.find('`', i + 1)
+                if close < hi and close > i + 1:
+                    out.append(_html_escape(s[text_start:i]))
+                    out.append(f'<code>{_html_escape(s[i + 1:close])}</code>')
+                    i = text_start = close + 1
+                    continue
+            elif self._bold.get(i, hi + 1) <= hi:
+                end = self._bold[i]
+                out.append(_html_escape(s[text_start:i]))
+                out.append('<strong>')
+                self.render(i + 2, end - 2)
+                out.append('</strong>')
+                i = text_start = end
+                continue
+            elif i == text_start or s[i - 1] != '*':
+                close = self.italic_close(i, hi)
+                if close > i + 1:
+                    out.append(_html_escape(s[text_start:i]))
+                    out.append('<em>')
+                    self.render(i + 1, close)
+                    out.append('</em>')
+                    i = text_start = close + 1
+                    continue
+            i += 1
+        out.append(_html_escape(s[text_start:hi]))
+
+
+def _inline_md(s: str) -> str:
+    """Very small markdown-ish inline renderer (no external deps).
+
+    Supports:
+    - **bold**
+    - *italic*
+    - `code`
+    - [text](url)
+    - footnote refs like [^1]
+    """
+    scanner = _InlineScanner(s)
+    scanner.render(0, len(s))
+    return ''.join(scanner.out)
+
+
+def render_post(md_path: str, cfg: dict, *, slug: str, md: str | None = None,
+                images: dict | None = None) -> str:
     import html as _html
-    import re as _re
 
-    md = open(md_path, 'r', encoding='utf-8').read()
+    if md is None:
+        md = open(md_path, 'r', encoding='utf-8').read()
     title = md_title(md)
     excerpt = md_excerpt(md)
 
     base = (cfg.get('base_url') or '').rstrip('/')
     canonical = f"{base}/posts/{slug}.html" if base else f"posts/{slug}.html"
 
-    def _inline_md(s: str) -> str:
-        """Very small markdown-ish inline renderer (no external deps).
-
-        Supports:
-        - **bold**
-        - *italic*
-        - `code`
-        - [text](url)
-        - footnote refs like [^1]
-        """
-        s = _html.escape(s, quote=True)
-
-        # links
-        s = _re.sub(r"\[([^\]]+?)\]\((https?://[^\s\)]+)\)", r"<a href=\"\2\">\1</a>", s)
-
-        # code
-        s = _re.sub(r"`([^`]+?)`", r"<code>\1</code>", s)
-
-        # bold then italic
-        s = _re.sub(r"\*\*([^*]+?)\*\*", r"<strong>\1</strong>", s)
-        s = _re.sub(r"(?<!\*)\*([^*]+?)\*(?!\*)", r"<em>\1</em>", s)
-
-        # footnote refs
-        s = _re.sub(r"\[\^(\d+)\]", r"<sup class=\"fn\">[\1]</sup>", s)
-        return s
-
     def _fix_img_src(tag: str) -> str:
         # Posts are under /posts/*.html, assets are under /assets/.
-        # If Commons helper produced src="assets/...", rewrite to "../assets/...".
-        return tag.replace('src="assets/', 'src="../assets/')
+        # If Commons helper produced src="assets/...", rewrite to "../assets/"
+        # (every candidate in a srcset too).
+        return _ASSET_ATTR.sub(lambda m: m.group(1) + _ASSET_URL.sub('../assets/', m.group(2)) + '"', tag)
 
     # basic block rendering with list support
     blocks: list[str] = []
@@ -174,7 +357,7 @@ def render_post(md_path: str, cfg: dict, *, slug: str) -> str:
         if s.startswith('[^') and ']: ' in s:
             # footnote definition
             flush_list()
-            m = _re.match(r"\[\^(\d+)\]:\s*(.*)$", s)
+            m = _FOOTNOTE_DEF.match(s)
             if m:
                 n, rest = m.group(1), m.group(2)
                 blocks.append(f"<p class=\"footnote\"><sup class=\"fn\">[{n}]</sup> {_inline_md(rest)}</p>")
@@ -184,7 +367,7 @@ def render_post(md_path: str, cfg: dict, *, slug: str) -> str:
 
         if s.startswith('<img '):
             flush_list()
-            blocks.append(_fix_img_src(s))
+            blocks.append(_fix_img_src(responsive_img(s, images) if images else s))
             continue
 
         blocks.append(f"<p>{_inline_md(s)}</p>")
@@ -210,7 +393,7 @@ def render_post(md_path: str, cfg: dict, *, slug: str) -> str:
 <meta property=\"og:description\" content=\"{meta_desc}\">
 <meta property=\"og:url\" content=\"{canonical}\">
 <meta name=\"twitter:card\" content=\"summary\">
-<style>{_theme_css()}</style>
+{_stylesheet_link('../')}
 </head>
 <body>
   <div class=\"wrap\">
@@ -233,6 +416,17 @@ def render_post(md_path: str, cfg: dict, *, slug: str) -> str:
 </body>
 </html>"""
 
+# URLs in briefs run until whitespace or an angle bracket; sentence
+# punctuation stuck to the end is moved back out of the link
+_BRIEF_URL = re.compile(r'https?://[^\s<>]+')
+
+
+def _brief_link(m: re.Match) -> str:
+    url = m.group()
+    core = url.rstrip('.,)]')
+    return f'<a href="{core}" target="_blank">{core}</a>{url[len(core):]}'
+
+
 def _brief_text_to_html(text: str) -> str:
     """Convert plain-text brief to HTML.
 
@@ -241,52 +435,56 @@ def _brief_text_to_html(text: str) -> str:
     - URLs are auto-linked
     - Newlines are preserved via <br> within paragraphs
     - Empty lines create paragraph breaks
-    """
-    import html as _html
-
-    # Match http/https URLs broadly (until whitespace or angle brackets)
-    # We will strip trailing punctuation manually in the replacement function.
-    url_re = re.compile(r'(https?://[^\s<>]+)')
-
-    lines_out = []
-    for line in text.splitlines():
-        s = line.strip()
-
-        # Section headers: lines like "[ KR ]" or "[산업 구조]"
-        m = re.match(r'^\[([^\]]+)\]\s*$', s)
-        if m:
-            lines_out.append(f'<h2>{_html.escape(m.group(1).strip())}</h2>')
-            continue
 
+    The text is escaped once up front (escaping never touches whitespace or
+    brackets), then each line is classified by its first/last character and
+    only lines containing "http" go through the URL regex.
+    """
+    out = []
+    for s in _html_escape(text, quote=True).splitlines():
+        s = s.strip()
         if not s:
-            lines_out.append('<br>')
-            continue
-
-        escaped = _html.escape(s)
-
-        def _linkify(match):
-            url = match.group(1)
-            # If URL ends with punctuation that was likely part of the sentence, strip it out.
-            # Common sentence stoppers: . , ) ]
-            trailing = ''
-            while url and url[-1] in '.,)]':
-                trailing = url[-1] + trailing
-                url = url[:-1]
-            return f'<a href="{url}" target="_blank">{url}</a>{trailing}'
-
-        # Auto-link URLs using the custom replacement function
-        escaped = url_re.sub(_linkify, escaped)
-        lines_out.append(escaped + '<br>')
-
-    return '\n'.join(lines_out)
+            out.append('<br>')
+        elif s[0] == '[' and s[-1] == ']' and len(s) > 2 and ']' not in s[1:-1]:
+            # section headers: lines like "[ KR ]" or "[산업 구조]"
+            out.append(f'<h2>{s[1:-1].strip()}</h2>')
+        elif 'http' in s:
+            out.append(_BRIEF_URL.sub(_brief_link, s) + '<br>')
+        else:
+            out.append(s + '<br>')
+    return '\n'.join(out)
+
+
+# Older/newer links on a brief page, filled in from docs/briefs/dates.json so
+# that publishing a new brief does not rewrite the previous one.
+_BRIEF_NAV_JS = """
+(() => {
+  const nav = document.getElementById('brief-nav');
+  fetch('../dates.json').then(r => r.json()).then(m => {
+    const k = m.kinds.indexOf(nav.dataset.kind);
+    const dates = m.dates.filter(d => d[1].includes(k)).map(d => d[0]);
+    const i = dates.indexOf(nav.dataset.date);
+    if (i < 0) return;
+    const link = (d, text) => { const a = document.createElement('a'); a.href = d + '.html'; a.textContent = text; return a; };
+    nav.replaceChildren(i > 0 ? link(dates[i - 1], '← ' + dates[i - 1]) : document.createElement('span'),
+                        i + 1 < dates.length ? link(dates[i + 1], dates[i + 1] + ' →') : document.createElement('span'));
+    nav.hidden = false;
+  }).catch(() => {});
+})();
+"""
 
 
 def render_brief(text: str, cfg: dict, *, title: str, date_str: str,
-                 back_href: str = '../../briefs/index.html') -> str:
-    """Render a plain-text brief into a full HTML page."""
+                 back_href: str = '../../briefs/index.html', kind: str | None = None) -> str:
+    """Render a plain-text brief into a full HTML page. With kind, the page
+    links to the previous/next brief of that kind (via dates.json)."""
     import html as _html
 
     body = _brief_text_to_html(text)
+    nav = ''
+    if kind:
+        nav = (f'<div class="pager" id="brief-nav" data-kind="{_html.escape(kind)}"'
+               f' data-date="{_html.escape(date_str)}" hidden></div>\n<script>{_BRIEF_NAV_JS}</script>')
     meta_title = _html.escape(title, quote=True)
     meta_site = _html.escape(cfg['title'], quote=True)
 
@@ -296,10 +494,7 @@ def render_brief(text: str, cfg: dict, *, title: str, date_str: str,
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <title>{meta_title} | {meta_site}</title>
-<style>{_theme_css()}
-.brief-body h2{{margin:26px 0 10px; font-size:20px; color:var(--brand2)}}
-.brief-body a{{word-break:break-all}}
-</style>
+{_stylesheet_link('../../')}
 </head>
 <body>
   <div class="wrap">
@@ -316,6 +511,7 @@ def render_brief(text: str, cfg: dict, *, title: str, date_str: str,
       <h1 class="h1">{meta_title}</h1>
       {body}
       <hr>
+      {nav}
       <div class="footer">© {meta_site} — built with OpenClaw</div>
     </div>
   </div>
@@ -323,85 +519,91 @@ def render_brief(text: str, cfg: dict, *, title: str, date_str: str,
 </html>"""
 
 
-def build_briefs(cfg: dict, out: Path) -> list:
-    """Scan brief directories, render individual pages, return list of entries
-    for the index. Each entry: (date_str, kind_label, kind_slug, html_path)."""
-    import html as _html
+def _render_brief_job(job: tuple) -> tuple:
+    """Pool worker: render one brief page to disk, return (index entry, write status)."""
+    text, cfg, title, entry, html_file = job
+    html = render_brief(text, cfg, title=title, date_str=entry[0], kind=entry[2])
+    return entry, write_if_changed(html_file, html)
 
-    # Where to look for briefs (outside the blog repo)
-    BRIEF_SOURCES = [
-        {
-            'label': '통합 브리핑',
-            'slug': 'morning',
-            'base': Path(os.path.expanduser('~/.openclaw/workspace/memory/briefing')),
-            'filename': 'final_briefing_ko.txt',
-        },
-        {
-            'label': 'InvestAnalyst 데일리 브리프',
-            'slug': 'invest',
-            'base': Path(os.path.expanduser('~/.openclaw/workspace/memory/investanalyst')),
-            'filename': 'daily_brief_ko.txt',
-        },
-    ]
 
-    entries = []
+def build_briefs(cfg: dict, out: Path, manifest: BuildManifest | None = None,
+                 executor=None, changes: OutputChanges | None = None,
+                 store: MetaStore | None = None) -> list:
+    """Scan the brief sources (brief_sources in site/config.json), render
+    individual pages, return list of entries for the index. Each entry:
+    (date_str, kind_label, kind_slug, html_path). With a store, the briefs
+    table is replaced by the entries found.
 
-    for src in BRIEF_SOURCES:
-        base_dir = src['base']
-        if not base_dir.exists():
-            continue
-        dest_dir = out / 'briefs' / src['slug']
+    With a store and a manifest, briefs whose file stat is unchanged are not
+    even read, and briefs whose text is unchanged are not re-rendered.
+    With an executor, stale briefs are rendered in worker processes."""
+    known = store.brief_stats() if store is not None else {}
+    entries = []
+    rows = []  # briefs table rows for the store
+    pending = []  # (entries index, manifest key, job)
+
+    for b in scan_briefs(brief_sources(cfg), known):
+        dest_dir = out / 'briefs' / b.kind
+        html_file = dest_dir / f'{b.date}.html'
+        # rel_path is relative to docs/briefs/index.html (not docs/)
+        rel_path = f"{b.kind}/{b.date}.html"
+        entry = (b.date, b.label, b.kind, rel_path)
+        rows.append((b.kind, b.date, b.label, b.rank, b.key, rel_path, b.size, b.mtime_ns))
+        if manifest is not None:
+            fresh = manifest.keep(html_file) if b.text is None else manifest.is_fresh(html_file, b.key)
+            if fresh:
+                entries.append(entry)
+                continue
+        entries.append(None)
         dest_dir.mkdir(parents=True, exist_ok=True)
+        text = b.text if b.text is not None else Path(b.path).read_text(encoding='utf-8')
+        pending.append((len(entries) - 1, b.key,
+                        (text, cfg, brief_title(b.label, b.date), entry, str(html_file))))
+
+    jobs = [job for _i, _key, job in pending]
+    for (i, key, job), (entry, status) in zip(pending, _run_jobs(executor, _render_brief_job, jobs)):
+        entries[i] = entry
+        if changes is not None:
+            changes.note(job[-1], status)
+        if manifest is not None:
+            manifest.record(job[-1], key)
+
+    if store is not None:
+        store.replace_briefs(rows)
+    return entries
 
-        for date_dir in sorted(base_dir.iterdir(), reverse=True):
-            if not date_dir.is_dir():
-                continue
-            # Expect YYYY-MM-DD directory names
-            date_str = date_dir.name
-            if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                continue
-            fpath = date_dir / src['filename']
-            if not fpath.exists():
-                continue
 
-            text = fpath.read_text(encoding='utf-8')
-            html = render_brief(
-                text, cfg,
-                title=f"{src['label']} — {date_str}",
-                date_str=date_str,
-            )
-            html_file = dest_dir / f'{date_str}.html'
-            html_file.write_text(html, encoding='utf-8')
+BRIEFS_RECENT_DATES = 14
 
-            # rel_path is relative to docs/briefs/index.html (not docs/)
-            rel_path = f"{src['slug']}/{date_str}.html"
-            entries.append((date_str, src['label'], src['slug'], rel_path))
 
-    return entries
+def _brief_date_list(entries: list, prefix: str) -> str:
+    """<li> per date (newest first) linking that day's briefs; entries are
+    (date, label, kind, path relative to docs/briefs/)."""
+    import html as _html
 
+    by_date: dict[str, list] = {}
+    for date_str, label, _slug, rel_path in entries:
+        by_date.setdefault(date_str, []).append((label, rel_path))
+    return '\n'.join(
+        f'<li><strong>{_html.escape(date_str)}</strong><br>'
+        + ' · '.join(f'<a href="{_html.escape(prefix + rp)}">{_html.escape(lbl)}</a>' for lbl, rp in by_date[date_str])
+        + '</li>'
+        for date_str in sorted(by_date, reverse=True))
+
+
+def _brief_month_label(month: str) -> str:
+    return f'{month[:4]}년 {int(month[5:])}월'
 
-def render_briefs_index(entries: list, cfg: dict) -> str:
-    """Render the briefs listing page."""
+
+def render_briefs_index(entries: list, cfg: dict, months: list | None = None) -> str:
+    """Render docs/briefs/index.html: the most recent dates (entries) plus
+    links to the monthly archives ([(month, dates), ...], newest first)."""
     import html as _html
 
-    # Group by date (reverse chronological)
-    from collections import OrderedDict
-    by_date: dict[str, list] = {}
-    for date_str, label, slug, rel_path in entries:
-        by_date.setdefault(date_str, []).append((label, slug, rel_path))
-
-    body_parts = []
-    for date_str in sorted(by_date.keys(), reverse=True):
-        items = by_date[date_str]
-        links = ' · '.join([
-            f'<a href="{_html.escape(rp)}">{_html.escape(lbl)}</a>'
-            for lbl, _slug, rp in items
-        ])
-        body_parts.append(
-            f'<li><strong>{_html.escape(date_str)}</strong><br>{links}</li>'
-        )
-
-    items_html = '\n'.join(body_parts) or '<li><small>아직 브리프가 없습니다.</small></li>'
+    items_html = _brief_date_list(entries, '') or '<li><small>아직 브리프가 없습니다.</small></li>'
+    month_links = ' · '.join(
+        f'<a href="archive/{m}.html">{_brief_month_label(m)}</a> <small>{n}일</small>' for m, n in months or [])
+    archive = f'<div class="h2">월별 아카이브</div>\n      <p>{month_links}</p>' if month_links else ''
     meta_site = _html.escape(cfg['title'], quote=True)
 
     return f"""<!doctype html>
@@ -411,7 +613,7 @@ def render_briefs_index(entries: list, cfg: dict) -> str:
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <title>Briefs | {meta_site}</title>
 <meta name="description" content="데일리 브리프 아카이브">
-<style>{_theme_css()}</style>
+{_stylesheet_link('../')}
 </head>
 <body>
   <div class="wrap">
@@ -426,6 +628,7 @@ def render_briefs_index(entries: list, cfg: dict) -> str:
     <div class="card">
       <div class="h2">데일리 브리프</div>
       <ul>{items_html}</ul>
+      {archive}
       <div class="footer">© {meta_site} — built with OpenClaw</div>
     </div>
   </div>
@@ -433,54 +636,89 @@ def render_briefs_index(entries: list, cfg: dict) -> str:
 </html>"""
 
 
-def main():
-    cfg=load_cfg()
-    out=Path('docs')
-    (out/'posts').mkdir(parents=True, exist_ok=True)
-    (out/'games').mkdir(parents=True, exist_ok=True)
+def render_briefs_month(month: str, entries: list, cfg: dict, *,
+                        newer: str | None = None, older: str | None = None) -> str:
+    """docs/briefs/archive/<YYYY-MM>.html: every brief of one month; newer and
+    older are the neighbouring months that have briefs."""
+    label = _brief_month_label(month)
+    pager = '<div class="pager">{}{}</div>'.format(
+        f'<a href="{newer}.html">← {_brief_month_label(newer)}</a>' if newer else '<a href="../index.html">← 최근 브리프</a>',
+        f'<a href="{older}.html">{_brief_month_label(older)} →</a>' if older else '<span></span>')
+    return _list_page(cfg, title=f'Briefs {label}', heading=f'데일리 브리프 · {label}', prefix='../../',
+                      body=f'<ul>{_brief_date_list(entries, "../")}</ul>', pager=pager)
 
-    posts=sorted(glob.glob('posts/*.md'))[::-1]
-    items=[]
-    for p in posts:
-        slug=os.path.splitext(os.path.basename(p))[0]
-        html=render_post(p,cfg,slug=slug)
-        (out/'posts'/f'{slug}.html').write_text(html,encoding='utf-8')
-        md=open(p,'r',encoding='utf-8').read()
-        items.append((slug, md_title(md), md_excerpt(md)))
 
-    # games: copy static directories into docs/games
-    game_dirs = []
-    for d in sorted(glob.glob('games/*')):
-        base = os.path.basename(d)
-        if base.startswith('_'):
-            continue
-        if not os.path.isdir(d):
-            continue
-        if os.path.exists(os.path.join(d, 'index.html')):
-            game_dirs.append(base)
+def render_brief_dates(dates: list, kinds: list, months: list) -> str:
+    """docs/briefs/dates.json: {"kinds": [slug, ...], "months": [[YYYY-MM, n], ...],
+    "dates": [[YYYY-MM-DD, [kind index, ...]], ...]}, newest first."""
+    index = {k: i for i, k in enumerate(kinds)}
+    by_date: dict[str, list] = {}
+    for date_str, kind in dates:
+        by_date.setdefault(date_str, []).append(index.get(kind, -1))
+    return json.dumps({'version': 1, 'kinds': kinds, 'months': [list(m) for m in months],
+                       'dates': [[d, by_date[d]] for d in sorted(by_date, reverse=True)]},
+                      ensure_ascii=False, separators=(',', ':')) + '\n'
 
-    # naive copy (clean then copy) to keep docs in sync
-    import shutil
-    for gd in game_dirs:
-        src = Path('games')/gd
-        dst = out/'games'/gd
-        if dst.exists():
-            shutil.rmtree(dst)
-        shutil.copytree(src, dst)
 
-    # games index
+def build_briefs_archive(cfg: dict, out: Path, manifest: BuildManifest, changes: OutputChanges,
+                         store: MetaStore) -> None:
+    """Briefs landing page, monthly archive pages and dates.json.
+
+    Each month page is keyed by its own rows (and neighbours), so only months
+    whose briefs changed are re-rendered.
+    """
+    briefs_dir = out/'briefs'
+    (briefs_dir/'archive').mkdir(parents=True, exist_ok=True)
+    months = store.brief_months()
+    recent = store.recent_brief_dates(BRIEFS_RECENT_DATES)
+    entries = store.briefs_since(recent[-1]) if recent else []
+    write_output(manifest, changes, briefs_dir/'index.html', sha256_json([entries, months]),
+                 lambda: render_briefs_index(entries, cfg, months))
+
+    names = [m for m, _n in months]
+    for i, month in enumerate(names):
+        rows = store.briefs_since(month + '-01', month + '-32')
+        newer = names[i - 1] if i > 0 else None
+        older = names[i + 1] if i + 1 < len(names) else None
+        write_output(manifest, changes, briefs_dir/'archive'/f'{month}.html', sha256_json([rows, newer, older]),
+                     lambda: render_briefs_month(month, rows, cfg, newer=newer, older=older))
+    for path in sorted((briefs_dir/'archive').glob('*.html')):
+        if path.stem not in names:
+            changes.remove(path)
+
+    kinds = [src['slug'] for src in brief_sources(cfg)]
+    changes.write(briefs_dir/'dates.json', render_brief_dates(store.brief_dates(), kinds, months))
+
+
+def _render_post_job(job: tuple) -> tuple:
+    """Pool worker: render one post to disk, return (slug, title, excerpt, write status)."""
+    md_path, cfg, slug, md, images, dest = job
+    status = write_if_changed(dest, render_post(md_path, cfg, slug=slug, md=md, images=images))
+    return slug, md_title(md), md_excerpt(md), status
+
+
+def _run_jobs(executor, fn, jobs: list) -> list:
+    """Run fn over jobs, in a process pool if one is given. Results keep job order."""
+    if executor is None or len(jobs) < 2:
+        return [fn(j) for j in jobs]
+    # small chunks keep workers balanced; pages vary a lot in size
+    return list(executor.map(fn, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def render_games_index(game_dirs: list, cfg: dict) -> str:
+    """Render docs/games/index.html."""
     games_list = "\n".join([
         f"<li><a href=\"{gd}/index.html\">{gd}</a></li>" for gd in game_dirs
     ]) or "<li><small>아직 게임이 없습니다.</small></li>"
 
-    games_index = f"""<!doctype html>
+    return f"""<!doctype html>
 <html lang=\"{cfg['language']}\">
 <head>
 <meta charset=\"utf-8\">
 <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">
 <title>Games | {cfg['title']}</title>
 <meta name=\"description\" content=\"PM Fieldnotes 미니 웹게임 아카이브\">
-<style>{_theme_css()}</style>
+{_stylesheet_link('../')}
 </head>
 <body>
   <div class=\"wrap\">
@@ -501,48 +739,175 @@ def main():
 </body>
 </html>"""
 
-    (out/'games'/'index.html').write_text(games_index, encoding='utf-8')
-
-    # catalog: copy catalog directory into docs/catalog
-    catalog_src = Path('catalog')
-    catalog_dst = out/'catalog'
-    if catalog_src.exists():
-        if catalog_dst.exists():
-            shutil.rmtree(catalog_dst)
-        shutil.copytree(catalog_src, catalog_dst)
-
-    # catalog html (reads catalog/index.json)
-    cat_items = []
-    try:
-        import json as _json
-        idx = _json.load(open(catalog_src/'index.json','r',encoding='utf-8'))
-        cat_items = (idx.get('items') or [])
-    except Exception:
-        cat_items = []
-
-    def _esc(s: str) -> str:
-        return (s or '').replace('&','&amp;').replace('<','&lt;').replace('>','&gt;')
-
-    lis = []
-    for it in cat_items[:200]:
-        title = _esc(it.get('title') or it.get('name') or 'Untitled')
-        src = _esc(it.get('source_name') or it.get('source') or '')
-        axis = ','.join(it.get('market_axis') or it.get('axis') or [])
-        url = it.get('url') or ''
-        summary = _esc(it.get('summary') or '')
-        link = f"<a href=\"{_esc(url)}\">원문</a>" if url else ""
-        lis.append(f"<li><b>{title}</b><br><small>{src} • {axis}</small><br><small>{summary}</small><br>{link}</li>")
 
-    cat_list = '\n'.join(lis) or '<li><small>아직 카탈로그 아이템이 없습니다.</small></li>'
-
-    catalog_html = f"""<!doctype html>
+# Virtual list for docs/catalog: fetches manifest.json, then only the shards
+# covering the visible rows, and keeps just those rows in the DOM. Filters
+# fetch the posting lists they need from facets/ (catalog_facets.py) and
+# intersect them; the list then shows only the matching positions.
+_CATALOG_JS = """
+(() => {
+  const ROW = 112, OVERSCAN = 8;
+  const FACETS = ['source_name', 'access_level', 'market_axis'];
+  const STOP = new Set('__STOPWORDS__'.split(' '));
+  const box = document.getElementById('catalog');
+  const status = document.getElementById('catalog-status');
+  const form = document.getElementById('catalog-filter');
+  const shards = new Map(), lists = new Map();
+  let man = null, fm = null, starts = [], view = null, seq = 0;
+
+  function shardOf(i) {
+    let lo = 0, hi = starts.length - 1;
+    while (lo < hi) { const mid = (lo + hi + 1) >> 1; if (starts[mid] <= i) lo = mid; else hi = mid - 1; }
+    return lo;
+  }
+  function load(k) {
+    if (!shards.has(k)) {
+      shards.set(k, fetch(man.shards[k].file).then(r => r.json()).then(items => {
+        shards.set(k, items); render();
+      }).catch(() => { shards.delete(k); }));
+    }
+    const v = shards.get(k);
+    return Array.isArray(v) ? v : null;
+  }
+  function el(tag, cls, text) {
+    const e = document.createElement(tag);
+    if (cls) e.className = cls;
+    if (text) e.textContent = text;
+    return e;
+  }
+  function row(j, it) {
+    const r = el('div', 'vrow');
+    r.style.top = (j * ROW) + 'px';
+    if (!it) { r.appendChild(el('small', '', '…')); return r; }
+    r.appendChild(el('b', 't', it.title || it.name || 'Untitled'));
+    const axis = (it.market_axis || it.axis || []).join(',');
+    r.appendChild(el('small', 't', [it.source_name || it.source || '', axis, it.published_at || ''].filter(Boolean).join(' • ')));
+    r.appendChild(el('small', 't', it.summary || ''));
+    if (/^https?:\\/\\//.test(it.url || '')) {
+      const a = el('a', '', '원문'); a.href = it.url; a.rel = 'noopener'; r.appendChild(a);
+    }
+    return r;
+  }
+  function size() { return view ? view.length : man.total; }
+  function render() {
+    if (!man) return;
+    const top = -box.getBoundingClientRect().top;
+    const first = Math.max(0, Math.floor(top / ROW) - OVERSCAN);
+    const last = Math.min(size(), Math.ceil((top + innerHeight) / ROW) + OVERSCAN);
+    const frag = document.createDocumentFragment();
+    for (let j = first; j < last; j++) {
+      const i = view ? view[j] : j, k = shardOf(i), items = load(k);
+      frag.appendChild(row(j, items && items[i - starts[k]]));
+    }
+    box.replaceChildren(frag);
+  }
+
+  // posting lists: sorted doc ids (oldest item = 0), delta-encoded
+  function list(file) {
+    if (!lists.has(file)) lists.set(file, fetch('facets/' + file).then(r => r.json()));
+    return lists.get(file);
+  }
+  function undelta(d) {
+    const out = new Array(d.length);
+    for (let i = 0, x = 0; i < d.length; i++) { x += d[i]; out[i] = x; }
+    return out;
+  }
+  function intersect(a, b) {
+    const out = [];
+    for (let i = 0, j = 0; i < a.length && j < b.length;) {
+      if (a[i] === b[j]) { out.push(a[i]); i++; j++; } else if (a[i] < b[j]) i++; else j++;
+    }
+    return out;
+  }
+  function fnv1a(s) {
+    let h = 0x811c9dc5;
+    for (const b of new TextEncoder().encode(s)) h = Math.imul(h ^ b, 0x01000193) >>> 0;
+    return h;
+  }
+  function terms(q) {
+    return [...new Set((q.toLowerCase().match(/[\\p{L}\\p{N}]+/gu) || []).filter(w => w.length > 1 && !STOP.has(w)))];
+  }
+  async function query() {
+    const want = [];
+    for (const f of FACETS) {
+      const v = form.elements[f].value;
+      if (v !== '') want.push(list(fm.facets[f][+v].file).then(undelta));
+    }
+    const days = +form.elements.days.value;
+    if (days) {
+      const since = new Date(Date.now() - days * 864e5).toISOString().slice(0, 10);
+      const months = Object.entries(fm.months).filter(([m]) => m >= since.slice(0, 7));
+      want.push(Promise.all(months.map(([, e]) => list(e.file))).then(all => {
+        let ids = [];
+        for (const byDay of all)
+          for (const [d, l] of Object.entries(byDay)) if (d >= since) ids = ids.concat(undelta(l));
+        return ids.sort((a, b) => a - b);
+      }));
+    }
+    for (const t of terms(form.elements.q.value)) {
+      const file = fm.terms.files[fnv1a(t) % fm.terms.buckets];
+      want.push(list(file).then(shard => shard[t] ? undelta(shard[t]) : []));
+    }
+    if (!want.length) return null;
+    const got = (await Promise.all(want)).sort((a, b) => a.length - b.length);
+    let ids = got[0];
+    for (let k = 1; k < got.length && ids.length; k++) ids = intersect(ids, got[k]);
+    // doc ids count from the oldest item; the list shows newest first
+    return ids.map(id => man.total - 1 - id).reverse();
+  }
+  async function apply() {
+    const mine = ++seq;
+    const v = fm ? await query() : null;
+    if (mine !== seq) return;
+    view = v;
+    box.style.height = (size() * ROW) + 'px';
+    status.textContent = view ? `${view.length.toLocaleString()}개 결과 / 전체 ${man.total.toLocaleString()}개`
+      : (man.total ? `${man.total.toLocaleString()}개 아이템` : '아직 카탈로그 아이템이 없습니다.');
+    render();
+  }
+
+  Promise.all([
+    fetch('manifest.json').then(r => r.json()),
+    fetch('facets/manifest.json').then(r => r.json()).catch(() => null),
+  ]).then(([m, f]) => {
+    man = m; fm = f;
+    let n = 0;
+    starts = m.shards.map(s => { const at = n; n += s.count; return at; });
+    if (fm) {
+      for (const name of FACETS) {
+        const sel = form.elements[name];
+        fm.facets[name].forEach((e, k) => sel.add(new Option(`${e.value} (${e.count})`, k)));
+        sel.disabled = !fm.facets[name].length;
+      }
+      form.hidden = false;
+    }
+    apply();
+  }).catch(() => { status.textContent = '카탈로그를 불러오지 못했습니다.'; });
+  form.addEventListener('input', apply);
+  form.addEventListener('submit', e => { e.preventDefault(); apply(); });
+  let queued = false;
+  addEventListener('scroll', () => {
+    if (queued) return;
+    queued = true;
+    requestAnimationFrame(() => { queued = false; render(); });
+  }, {passive: true});
+  addEventListener('resize', render);
+})();
+""".replace('__STOPWORDS__', ' '.join(sorted(CATALOG_STOPWORDS)))
+
+
+def render_catalog_page(cfg: dict) -> str:
+    """Render docs/catalog/index.html: a virtual list over the JSON shards
+    (manifest.json + shards/*.json) written by catalog_io.write_shards, with
+    filters backed by the posting lists from catalog_facets.build_facets."""
+    return f"""<!doctype html>
 <html lang=\"{cfg['language']}\">
 <head>
 <meta charset=\"utf-8\">
 <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">
 <title>Catalog | {cfg['title']}</title>
 <meta name=\"description\" content=\"InvestAnalyst research catalog (metadata only)\">
-<style>{_theme_css()}</style>
+{_stylesheet_link('../')}
 </head>
 <body>
   <div class=\"wrap\">
@@ -556,32 +921,41 @@ def main():
 
     <div class=\"card\">
       <div class=\"h2\">Research Catalog (metadata)</div>
-      <div class=\"meta\">index.json: <a href=\"index.json\">download</a></div>
+      <div class=\"meta\"><span id=\"catalog-status\">불러오는 중…</span> · JSON: <a href=\"manifest.json\">manifest</a></div>
+      <form id=\"catalog-filter\" class=\"filters\" hidden>
+        <input name=\"q\" type=\"search\" placeholder=\"키워드 (title/summary)\" aria-label=\"키워드\">
+        <select name=\"source_name\" aria-label=\"출처\"><option value=\"\">모든 출처</option></select>
+        <select name=\"access_level\" aria-label=\"접근\"><option value=\"\">모든 접근 수준</option></select>
+        <select name=\"market_axis\" aria-label=\"축\"><option value=\"\">모든 축</option></select>
+        <select name=\"days\" aria-label=\"기간\"><option value=\"0\">전체 기간</option><option value=\"7\">최근 7일</option><option value=\"30\">최근 30일</option><option value=\"90\">최근 90일</option><option value=\"365\">최근 1년</option></select>
+      </form>
       <hr>
-      <ul>{cat_list}</ul>
+      <noscript><p><small>목록을 보려면 JavaScript가 필요합니다. 데이터는 <a href=\"manifest.json\">manifest.json</a>의 shard 파일에 있습니다.</small></p></noscript>
+      <div id=\"catalog\" class=\"vlist\"></div>
       <div class=\"footer\">© {cfg['title']} — built with OpenClaw</div>
     </div>
   </div>
+<script>{_CATALOG_JS}</script>
 </body>
 </html>"""
 
-    (out/'catalog'/'index.html').write_text(catalog_html, encoding='utf-8')
 
-    # briefs: scan external brief directories and render pages + index
-    brief_entries = build_briefs(cfg, out)
-    briefs_idx_dir = out / 'briefs'
-    briefs_idx_dir.mkdir(parents=True, exist_ok=True)
-    (briefs_idx_dir / 'index.html').write_text(
-        render_briefs_index(brief_entries, cfg), encoding='utf-8')
-
-    index_items='\n'.join([
-        f"<li><a href=\"posts/{slug}.html\">{title}</a><br><small>{ex}</small></li>" for slug,title,ex in items
+def _post_list(items: list, prefix: str) -> str:
+    return '\n'.join([
+        f"<li><a href=\"{prefix}posts/{slug}.html\">{title}</a><br><small>{ex}</small></li>" for slug,title,ex in items
     ])
 
+
+def render_index(items: list, cfg: dict, older_page: int | None = None) -> str:
+    """Render the home page. items: [(slug, title, excerpt), ...] newest first
+    (one page worth); older_page is the numbered page to continue with."""
+    index_items=_post_list(items, '')
+    older = f'<a href="page/{older_page}.html">이전 글 →</a>' if older_page else '<span></span>'
+
     base = (cfg.get('base_url') or '').rstrip('/')
     canonical = f"{base}/" if base else "index.html"
 
-    index=f"""<!doctype html>
+    return f"""<!doctype html>
 <html lang=\"{cfg['language']}\">
 <head>
 <meta charset=\"utf-8\">
@@ -595,7 +969,9 @@ def main():
 <meta property=\"og:url\" content=\"{canonical}\">
 <meta name=\"twitter:card\" content=\"summary\">
 <link rel=\"alternate\" type=\"application/rss+xml\" title=\"{cfg['title']} RSS\" href=\"{base}/rss.xml\" />
-<style>{_theme_css()}</style>
+<link rel=\"alternate\" type=\"application/atom+xml\" title=\"{cfg['title']} Atom\" href=\"{base}/feeds/posts/atom.xml\" />
+<link rel=\"alternate\" type=\"application/feed+json\" title=\"{cfg['title']} JSON Feed\" href=\"{base}/feeds/posts/feed.json\" />
+{_stylesheet_link('')}
 </head>
 <body>
   <div class=\"wrap\">
@@ -604,78 +980,605 @@ def main():
         <div>{cfg['title']}</div>
         <div class=\"tagline\">{cfg['description']}</div>
       </div></div>
-      <div class=\"meta\"><span class=\"kbd\">매일 발행</span> · <a href=\"briefs/index.html\">Briefs</a> · <a href=\"games/index.html\">Games</a> · <a href=\"catalog/index.html\">Catalog</a></div>
+      <div class=\"meta\"><span class=\"kbd\">매일 발행</span> · <a href=\"briefs/index.html\">Briefs</a> · <a href=\"games/index.html\">Games</a> · <a href=\"catalog/index.html\">Catalog</a> · <a href=\"search/index.html\">Search</a></div>
     </div>
 
     <div class=\"card\">
       <div class=\"h2\">최근 글</div>
       <ul>{index_items}</ul>
+      <div class=\"pager\"><a href=\"archive/index.html\">월별 아카이브</a>{older}</div>
       <div class=\"footer\">© {cfg['title']} — built with OpenClaw</div>
     </div>
   </div>
 </body>
 </html>"""
 
-    (out/'index.html').write_text(index,encoding='utf-8')
 
-    # robots.txt + sitemap.xml + rss.xml for SEO
-    base = (cfg.get('base_url') or '').rstrip('/')
+def _list_page(cfg: dict, *, title: str, heading: str, prefix: str, body: str, pager: str = '') -> str:
+    """Shell shared by the numbered index pages and the date archives."""
+    return f"""<!doctype html>
+<html lang=\"{cfg['language']}\">
+<head>
+<meta charset=\"utf-8\">
+<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">
+<title>{title} | {cfg['title']}</title>
+<meta name=\"description\" content=\"{cfg['description']}\">
+{_stylesheet_link(prefix)}
+</head>
+<body>
+  <div class=\"wrap\">
+    <div class=\"nav\">
+      <div class=\"brand\"><div class=\"logo\"></div><div>
+        <div>{cfg['title']}</div>
+        <div class=\"tagline\">{cfg['description']}</div>
+      </div></div>
+      <div class=\"meta\"><a href=\"{prefix}index.html\">← 홈</a> · <a href=\"{prefix}archive/index.html\">Archive</a></div>
+    </div>
+
+    <div class=\"card\">
+      <div class=\"h2\">{heading}</div>
+      {body}
+      {pager}
+      <div class=\"footer\">© {cfg['title']} — built with OpenClaw</div>
+    </div>
+  </div>
+</body>
+</html>"""
+
 
-    robots = "\n".join([
+def render_index_page(items: list, cfg: dict, *, page: int, pages: int) -> str:
+    """docs/page/<page>.html; page 1 holds the oldest posts, so a full page never
+    changes (the markup depends on pages only through "is this the last one")."""
+    newer = (f'<a href="{page + 1}.html">← 최신 글</a>' if page < pages
+             else '<a href="../index.html">← 최신 글</a>')
+    older = f'<a href="{page - 1}.html">이전 글 →</a>' if page > 1 else '<span></span>'
+    return _list_page(cfg, title=f'{page} 페이지', heading=f'글 목록 · {page} 페이지', prefix='../',
+                      body=f'<ul>{_post_list(items, "../")}</ul>',
+                      pager=f'<div class="pager">{newer}{older}</div>')
+
+
+def render_month_archive(month: str, items: list, cfg: dict) -> str:
+    """docs/archive/<YYYY>/<MM>.html: every post dated in that month."""
+    y, m = month.split('-')
+    label = f'{y}년 {int(m)}월'
+    return _list_page(cfg, title=label, heading=f'{label} · {len(items)}개의 글', prefix='../../',
+                      body=f'<ul>{_post_list(items, "../../")}</ul>',
+                      pager=f'<div class="pager"><a href="index.html">← {y}년</a><span></span></div>')
+
+
+def render_year_archive(year: str, months: list, cfg: dict) -> str:
+    """docs/archive/<YYYY>/index.html: months of the year with post counts."""
+    lis = '\n'.join(f'<li><a href="{m[5:]}.html">{int(m[5:])}월</a> <small>{n}개</small></li>' for m, n in months)
+    return _list_page(cfg, title=f'{year}년', heading=f'{year}년 아카이브', prefix='../../',
+                      body=f'<ul>{lis}</ul>',
+                      pager='<div class="pager"><a href="../index.html">← 전체 아카이브</a><span></span></div>')
+
+
+def render_archive_index(years: list, cfg: dict) -> str:
+    """docs/archive/index.html: years with post counts."""
+    lis = '\n'.join(f'<li><a href="{y}/index.html">{y}년</a> <small>{n}개</small></li>' for y, n in years)
+    return _list_page(cfg, title='Archive', heading='아카이브', prefix='../',
+                      body=f'<ul>{lis or "<li><small>아직 글이 없습니다.</small></li>"}</ul>')
+
+
+# Search over docs/search (post_search.py): tokenizes the query like the
+# indexer, fetches one bucket per token (by the hash of its two-character
+# prefix), decodes and intersects the posting lists and then loads only the
+# doc chunks holding the newest LIMIT hits.
+_SEARCH_JS = """
+(() => {
+  const LIMIT = 50;
+  const form = document.getElementById('search-form');
+  const status = document.getElementById('search-status');
+  const list = document.getElementById('search-results');
+  const cache = new Map();
+  let man = null, seq = 0, timer = 0;
+
+  function get(url) {
+    if (!cache.has(url)) cache.set(url, fetch(url).then(r => r.json()).catch(() => { cache.delete(url); return null; }));
+    return cache.get(url);
+  }
+  function tokens(q) {
+    const out = new Set();
+    for (const run of q.normalize('NFKC').toLowerCase().match(/[\\uac00-\\ud7a3]+|[a-z0-9]+/g) || []) {
+      if (run >= '\\uac00') {
+        if (run.length === 1) out.add(run);
+        for (let i = 0; i + 1 < run.length; i++) out.add(run.slice(i, i + 2));
+      } else if (run.length > 1) out.add(run);
+    }
+    return [...out];
+  }
+  function fnv1a(s) {
+    let h = 0x811c9dc5;
+    for (const b of new TextEncoder().encode(s)) h = Math.imul(h ^ b, 0x01000193) >>> 0;
+    return h;
+  }
+  function postings(s) {
+    const b = atob(s), out = [];
+    for (let i = 0, x = 0; i < b.length;) {
+      let v = 0, shift = 0, c;
+      do { c = b.charCodeAt(i++); v += (c & 127) * 2 ** shift; shift += 7; } while (c & 128);
+      x += v;
+      out.push(x);
+    }
+    return out;
+  }
+  function intersect(a, b) {
+    const out = [];
+    for (let i = 0, j = 0; i < a.length && j < b.length;) {
+      if (a[i] === b[j]) { out.push(a[i]); i++; j++; } else if (a[i] < b[j]) i++; else j++;
+    }
+    return out;
+  }
+  async function search(ts) {
+    const shards = new Set(man.shards);
+    const got = await Promise.all(ts.map(t => {
+      const b = Math.floor(fnv1a(t.slice(0, 2)) % man.slots / (man.slots / man.buckets));
+      return shards.has(b) ? get(`t/${b}.json`).then(s => s && s[t] ? postings(s[t]) : []) : [];
+    }));
+    got.sort((a, b) => a.length - b.length);
+    let ids = got[0];
+    for (let k = 1; k < got.length && ids.length; k++) ids = intersect(ids, got[k]);
+    return ids;
+  }
+  function el(tag, text) {
+    const e = document.createElement(tag);
+    if (text) e.textContent = text;
+    return e;
+  }
+  async function run() {
+    const mine = ++seq, q = form.elements.q.value.trim(), ts = tokens(q);
+    history.replaceState(null, '', q ? '?q=' + encodeURIComponent(q) : location.pathname);
+    if (!man || !ts.length) { list.replaceChildren(); status.textContent = man ? `${man.docs}개의 글` : ''; return; }
+    const ids = await search(ts);
+    const top = ids.slice(-LIMIT).reverse();
+    const rows = new Map();
+    const chunks = [...new Set(top.map(d => Math.floor(d / man.chunk)))];
+    for (const c of await Promise.all(chunks.map(n => get(`d/${n}.json`))))
+      for (const r of c || []) rows.set(r[0], r);
+    if (mine !== seq) return;
+    const hits = top.map(d => rows.get(d)).filter(Boolean)
+      .sort((a, b) => (b[3] || '').localeCompare(a[3] || '') || b[0] - a[0]);
+    list.replaceChildren(...hits.map(([, slug, title, date]) => {
+      const li = el('li'), a = el('a', title);
+      a.href = `../posts/${slug}.html`;
+      li.append(a, el('br'), el('small', date || ''));
+      return li;
+    }));
+    status.textContent = ids.length > LIMIT ? `${ids.length}개 결과 중 최근 ${LIMIT}개` : `${ids.length}개 결과`;
+  }
+
+  get('manifest.json').then(m => {
+    man = m;
+    if (!m) { status.textContent = '검색 색인을 불러오지 못했습니다.'; return; }
+    form.elements.q.value = new URLSearchParams(location.search).get('q') || '';
+    run();
+  });
+  form.addEventListener('input', () => { clearTimeout(timer); timer = setTimeout(run, 150); });
+  form.addEventListener('submit', e => { e.preventDefault(); run(); });
+})();
+"""
+
+
+def render_search_page(cfg: dict) -> str:
+    """docs/search/index.html: static page; the index is fetched per query."""
+    body = f"""<form id=\"search-form\" class=\"filters\" role=\"search\">
+        <input name=\"q\" type=\"search\" placeholder=\"검색어 (두 글자 이상)\" aria-label=\"검색어\" autofocus>
+      </form>
+      <div class=\"meta\"><span id=\"search-status\"></span></div>
+      <noscript><p><small>검색하려면 JavaScript가 필요합니다. <a href=\"../archive/index.html\">아카이브</a>에서 글을 찾아보세요.</small></p></noscript>
+      <ul id=\"search-results\"></ul>
+      <script>{_SEARCH_JS}</script>"""
+    return _list_page(cfg, title='Search', heading='글 검색', prefix='../', body=body)
+
+
+def render_robots(cfg: dict) -> str:
+    base = (cfg.get('base_url') or '').rstrip('/')
+    return "\n".join([
         "User-agent: *",
         "Allow: /",
         f"Sitemap: {base}/sitemap.xml" if base else "",
         "",
     ]).strip() + "\n"
-    (out/'robots.txt').write_text(robots, encoding='utf-8')
-
-    # sitemap
-    urls = []
-    if base:
-        urls.append(f"{base}/")
-        urls.append(f"{base}/briefs/index.html")
-        urls.append(f"{base}/games/index.html")
-        urls.append(f"{base}/catalog/index.html")
-        for slug, _t, _ex in items:
-            urls.append(f"{base}/posts/{slug}.html")
-        for gd in game_dirs:
-            urls.append(f"{base}/games/{gd}/index.html")
-        for _d, _l, _s, rp in brief_entries:
-            urls.append(f"{base}/{rp}")
-        # catalog items are not enumerated in sitemap (metadata is in index.json)
-
-    sitemap_items = "\n".join([f"  <url><loc>{u}</loc></url>" for u in urls])
-    sitemap = "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n" \
-              "<urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">\n" \
-              f"{sitemap_items}\n" \
-              "</urlset>\n"
-    (out/'sitemap.xml').write_text(sitemap, encoding='utf-8')
-
-    # rss
-    def xml_escape(s: str) -> str:
-        return (s or "").replace("&","&amp;").replace("<","&lt;").replace(">","&gt;")
-
-    rss_items = []
-    for slug, t, ex in items[:20]:
-        link = f"{base}/posts/{slug}.html" if base else f"posts/{slug}.html"
-        rss_items.append(
-            "<item>"
-            f"<title>{xml_escape(t)}</title>"
-            f"<link>{xml_escape(link)}</link>"
-            f"<guid>{xml_escape(link)}</guid>"
-            f"<description>{xml_escape(ex)}</description>"
-            "</item>"
-        )
-
-    rss = "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n" \
-          "<rss version=\"2.0\"><channel>" \
-          f"<title>{xml_escape(cfg['title'])}</title>" \
-          f"<link>{xml_escape(base + '/') if base else ''}</link>" \
-          f"<description>{xml_escape(cfg['description'])}</description>" \
-          + "".join(rss_items) + \
-          "</channel></rss>\n"
-
-    (out/'rss.xml').write_text(rss, encoding='utf-8')
+
+
+def sitemap_urls(out: Path, manifest: BuildManifest, store: MetaStore, cfg: dict) -> list:
+    """(shard, path, content hash) for every URL in the sitemaps (see sitemaps.py).
+
+    Hashes are the inputs pages were rendered from (not their bytes), so a
+    renderer change does not move every lastmod.
+    """
+    def src(rel: str) -> str:
+        return manifest.source(out/rel) or ''
+
+    urls = [('pages', '', src('index.html'))]
+    for rel in ('briefs/index.html', 'games/index.html', 'search/index.html', 'archive/index.html'):
+        urls.append(('pages', rel, src(rel)))
+    urls.append(('pages', 'catalog/index.html', src('catalog/manifest.json')))
+    for year, _n in store.year_counts():
+        urls.append(('pages', f'archive/{year}/index.html', src(f'archive/{year}/index.html')))
+    for month, _n in store.month_counts():
+        rel = f'archive/{month[:4]}/{month[5:]}.html'
+        urls.append(('pages', rel, src(rel)))
+    for month, _n in store.brief_months():
+        urls.append(('pages', f'briefs/archive/{month}.html', src(f'briefs/archive/{month}.html')))
+
+    for slug, date, src_hash in store.post_sources():
+        urls.append((f'posts-{date[:4]}' if date else 'posts', f'posts/{slug}.html', src_hash))
+    for gd in store.games():
+        page = out/'games'/gd/'index.html'
+        urls.append(('games', f'games/{gd}/index.html', sha256_file(page) if page.exists() else ''))
+    for (kind, date), (_size, _mtime, key) in sorted(store.brief_stats().items()):
+        urls.append((f'briefs-{date[:4]}', f'briefs/{kind}/{date}.html', key))
+    # catalog items are not enumerated (their metadata is in the catalog shards)
+    return urls
+
+
+def site_tz(cfg: dict):
+    """The site's timezone (config "timezone"), UTC if unknown."""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(cfg.get('timezone') or 'UTC')
+    except Exception:
+        return dt.timezone.utc
+
+
+def build_date(cfg: dict) -> str:
+    """Today's date (YYYY-MM-DD) in the site's timezone."""
+    return dt.datetime.now(site_tz(cfg)).date().isoformat()
+
+
+# the catalog has tens of thousands of items; bigger archive pages keep the
+# number of documents a backfilling reader has to fetch reasonable
+CATALOG_FEED_PAGE_SIZE = 500
+
+
+def feed_sections(cfg: dict, store: MetaStore, base: str) -> list:
+    """(Feed, entries oldest first) for the posts, briefs and games feeds
+    (see feeds.py; the catalog is streamed by build_feeds).
+
+    Entry updated dates are the sitemap lastmods, so build_sitemaps must
+    run first; everything else comes from the metadata store.
+    """
+    lastmod = {loc: m for loc, (_h, m) in store.sitemap_entries().items()}
+    common = dict(base=base, language=cfg['language'], tz=site_tz(cfg))
+
+    def entry(rel: str, title: str, summary: str, date) -> FeedEntry:
+        link = f'{base}/{rel}'
+        return FeedEntry(link, title, link, summary, date or '', lastmod.get(link, ''))
+
+    posts = [entry(f'posts/{slug}.html', title, ex, date) for slug, title, ex, date in store.feed_posts()]
+    briefs = [entry(f'briefs/{kind}/{date}.html', brief_title(label, date), label, date)
+              for date, label, kind, _path in reversed(store.briefs_since(''))]
+    games = [entry(f'games/{gd}/index.html', gd, gd, slug_date(gd)) for gd in store.games()]
+    return [
+        (Feed('posts', cfg['title'], cfg['description'], f'{base}/', **common), posts),
+        (Feed('briefs', f"Briefs | {cfg['title']}", '데일리 브리핑', f'{base}/briefs/index.html', **common),
+         briefs),
+        (Feed('games', f"Games | {cfg['title']}", 'PM Fieldnotes 미니 웹게임 아카이브',
+              f'{base}/games/index.html', **common), games),
+    ]
+
+
+def build_feeds(cfg: dict, out: Path, manifest: BuildManifest, changes: OutputChanges,
+                store: MetaStore) -> None:
+    """RSS, Atom and JSON Feed documents per section under docs/feeds/, plus
+    docs/rss.xml (the posts RSS, at its original URL).
+
+    A section whose inputs are unchanged since the last build is skipped
+    without rendering; otherwise unchanged documents are still not rewritten.
+    """
+    base = (cfg.get('base_url') or '').rstrip('/')
+    for feed, entries in feed_sections(cfg, store, base):
+        key = sha256_json([FEED_VERSION, feed.section, entries])
+        atom = out/'feeds'/feed.section/'atom.xml'
+        if manifest.is_fresh(atom, key) and (feed.section != 'posts' or (out/'rss.xml').exists()):
+            continue
+        write_feeds(feed, lambda i: entries[i:], len(entries), out, changes,
+                    rss_alias='rss.xml' if feed.section == 'posts' else None)
+        manifest.record(atom, key)
+
+    # the catalog feed is keyed on the catalog's source hash and size, and its
+    # rows are streamed from the store, so a large catalog is never held in memory
+    size = CATALOG_FEED_PAGE_SIZE
+    count = store.catalog_count()
+    atom = out/'feeds'/'catalog'/'atom.xml'
+    key = sha256_json([FEED_VERSION, 'catalog', size, store.get_state('catalog_hash'), count])
+    if manifest.is_fresh(atom, key):
+        return
+    first_page = 1
+    if store.catalog_changed_from is not None and manifest.keep(atom) \
+            and manifest.source(atom) == sha256_json([FEED_VERSION, 'catalog', size, *store.catalog_previous]):
+        # archive pages before the first changed row are still current, except
+        # the last one when the page count moved (its next-archive link)
+        first_page = store.catalog_changed_from // size + 1
+        old_pages, pages = store.catalog_previous[1] // size, count // size
+        if old_pages != pages:
+            first_page = max(1, min(first_page, old_pages, pages))
+
+    def rows(offset: int):
+        for cid, title, url, source, date in store.catalog_feed(offset):
+            yield FeedEntry(url or f'urn:catalog:{cid}', title, url or f'{base}/catalog/index.html',
+                            source, date or '', '')
+
+    feed = Feed('catalog', f"Catalog | {cfg['title']}", '수집한 외부 글 카탈로그', f'{base}/catalog/index.html',
+                base=base, language=cfg['language'], tz=site_tz(cfg))
+    write_feeds(feed, rows, count, out, changes, page_size=size, first_page=first_page)
+    manifest.record(atom, key)
+
+
+def write_output(manifest: BuildManifest, changes: OutputChanges, path: Path, src_hash: str, render) -> bool:
+    """Write render() to path unless the manifest says it is already current
+    or the rendered bytes are identical to what is on disk.
+
+    Returns True if the file was (re)written.
+    """
+    if manifest.is_fresh(path, src_hash):
+        return False
+    written = changes.write(path, render())
+    manifest.record(path, src_hash)
+    return written
+
+
+def build_post_indexes(cfg: dict, out: Path, manifest: BuildManifest, changes: OutputChanges,
+                       store: MetaStore) -> None:
+    """Front page, numbered index pages and month/year archives.
+
+    Pages are numbered from the oldest post, so page k only changes when a
+    post at or after its position is added, edited or removed. Pages and
+    months not touched by store.dirty_posts are trusted from the manifest
+    without querying their rows.
+    """
+    size = max(1, int(cfg.get('page_size') or 20))
+    n = store.post_count()
+    pages = -(-n // size)
+    try:
+        prev_pages = int(store.get_state('index_pages') or 0)
+    except ValueError:
+        prev_pages = 0
+    dirty = store.dirty_posts
+
+    newest = store.recent_posts(size)
+    older_page = (n - size - 1) // size + 1 if n > size else None
+    write_output(manifest, changes, out/'index.html', sha256_json([newest, older_page]),
+                 lambda: render_index(newest, cfg, older_page))
+
+    # numbered pages: only those from the first changed position on, plus the
+    # old last page if the page count moved (its "newer" link changes)
+    if store.all_posts_dirty:
+        first = 1
+    else:
+        first = store.post_rank(min(dirty)) // size + 1 if dirty else pages + 1
+        if prev_pages != pages:
+            first = min(first, max(1, min(prev_pages, pages)))
+    (out/'page').mkdir(parents=True, exist_ok=True)
+    for k in range(1, pages + 1):
+        path = out/'page'/f'{k}.html'
+        if k < first and manifest.keep(path):
+            continue
+        rows = store.posts_range((k - 1) * size, size)[::-1]
+        write_output(manifest, changes, path, sha256_json([rows, k, k < pages]),
+                     lambda: render_index_page(rows, cfg, page=k, pages=pages))
+    for k in range(pages + 1, prev_pages + 1):
+        if (out/'page'/f'{k}.html').exists():
+            changes.remove(out/'page'/f'{k}.html')
+    store.set_state('index_pages', str(pages))
+
+    # month archives: re-query only the months a changed post falls in
+    dirty_months = {d[:7] for d in map(slug_date, dirty) if d}
+    months = store.month_counts()
+    for month, _count in months:
+        path = out/'archive'/month[:4]/f'{month[5:]}.html'
+        if not store.all_posts_dirty and month not in dirty_months and manifest.keep(path):
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = store.posts_in_month(month)
+        write_output(manifest, changes, path, sha256_json(rows),
+                     lambda: render_month_archive(month, rows, cfg))
+    live = {m for m, _n in months}
+    for month in sorted(dirty_months - live):
+        path = out/'archive'/month[:4]/f'{month[5:]}.html'
+        if path.exists():
+            changes.remove(path)
+
+    # year pages and the archive index only carry counts: always cheap
+    years = store.year_counts()
+    for year, _count in years:
+        year_months = store.month_counts(year)
+        write_output(manifest, changes, out/'archive'/year/'index.html', sha256_json(year_months),
+                     lambda: render_year_archive(year, year_months, cfg))
+    for year in sorted({m[:4] for m in dirty_months} - {y for y, _n in years}):
+        if (out/'archive'/year/'index.html').exists():
+            changes.remove(out/'archive'/year/'index.html')
+    (out/'archive').mkdir(parents=True, exist_ok=True)
+    write_output(manifest, changes, out/'archive'/'index.html', sha256_json(years),
+                 lambda: render_archive_index(years, cfg))
+
+
+def build_site(cfg: dict | None = None, *, changed=None, force: bool = False,
+               jobs: int = 1) -> dict:
+    """Render the site into docs/ (paths are relative to the repo root / cwd).
+
+    cfg: site config; loaded from site/config.json if omitted.
+    changed: optional iterable of source paths (e.g. 'posts/<slug>.md') the
+        caller knows it touched. Other posts that already have a build record
+        are then trusted without re-reading them.
+    force: ignore the build manifest and re-render everything.
+    jobs: worker processes for post/brief rendering (0 = one per CPU).
+
+    Returns {'posts': total posts, 'rendered_posts': re-rendered posts,
+    'created'/'changed'/'deleted': sorted output paths}. Only files whose
+    bytes changed are listed, so callers can stage exactly those with git.
+    """
+    cfg = cfg if cfg is not None else load_cfg()
+    out=Path('docs')
+    (out/'posts').mkdir(parents=True, exist_ok=True)
+    (out/'games').mkdir(parents=True, exist_ok=True)
+
+    # pages link the stylesheet by its hashed name, so a theme change makes them stale
+    changes = OutputChanges()
+    write_stylesheet(out, changes)
+    renderer = f"{RENDERER_VERSION}+{_stylesheet()[0]}"
+    manifest = BuildManifest(MANIFEST_PATH, renderer=renderer, cfg_hash=sha256_json(cfg))
+    store = MetaStore(META_STORE_PATH)
+    if force:
+        manifest.reset()
+        store.reset()
+    hint = None if changed is None else {os.path.normpath(str(c)) for c in changed}
+
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        result = _build(cfg, out, manifest, executor, hint, changes, store)
+        store.commit()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        store.close()
+    manifest.save()
+    result.update(changes.as_dict())
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Render posts, briefs, games and catalog into docs/.')
+    ap.add_argument('--force', action='store_true', help='ignore the build manifest and re-render everything')
+    ap.add_argument('--jobs', '-j', type=int, default=1,
+                    help='render posts and briefs in N worker processes (0 = one per CPU)')
+    args = ap.parse_args(argv)
+
+    result = build_site(force=args.force, jobs=args.jobs)
+    print(f"rendered {result['rendered_posts']}/{result['posts']} posts; "
+          f"{len(result['created'])} created, {len(result['changed'])} changed, "
+          f"{len(result['deleted'])} deleted outputs")
+
+
+def _build(cfg: dict, out: Path, manifest: BuildManifest, executor, hint: set | None,
+           changes: OutputChanges, store: MetaStore) -> dict:
+    # resized/WebP derivatives of docs/assets/images (no-op if unchanged)
+    images = build_variants(out/'assets'/'images', changes=changes)
+
+    posts=sorted(glob.glob('posts/*.md'))[::-1]
+    slugs=[]
+    pending=[]  # (source hash, job)
+    to_index=[]  # (slug, markdown) for the search index
+    for p in posts:
+        slug=os.path.splitext(os.path.basename(p))[0]
+        slugs.append(slug)
+        dest=out/'posts'/f'{slug}.html'
+        known=store.post_hash(slug)
+        if hint is not None and os.path.normpath(p) not in hint and known and manifest.keep(dest):
+            continue
+        raw=Path(p).read_bytes()
+        src=sha256_bytes(raw)
+        post_images = None
+        if b'assets/images/' in raw:
+            post_images = referenced(raw.decode('utf-8'), images)
+            if post_images:
+                # a re-derived image changes the post's <picture> markup
+                src = sha256_json([src, post_images])
+        md=raw.decode('utf-8')
+        if manifest.is_fresh(dest, src):
+            if known != src:
+                # page is current but the store lost its row (e.g. deleted cache)
+                store.put_post(slug, md_title(md), md_excerpt(md), src, str(dest))
+                to_index.append((slug, md))
+            continue
+        pending.append((src, (p, cfg, slug, md, post_images, str(dest))))
+
+    # workers write the pages; only the metadata for aggregate pages comes back
+    results = _run_jobs(executor, _render_post_job, [job for _src, job in pending])
+    for (src, job), (slug, title, ex, status) in zip(pending, results):
+        changes.note(job[-1], status)
+        manifest.record(job[-1], src)
+        store.put_post(slug, title, ex, src, job[-1])
+        to_index.append((slug, job[3]))
+    store.retain_posts(slugs)
+    # pages of deleted posts (also those a wiped store no longer knows about)
+    live = set(slugs)
+    for page in sorted((out/'posts').glob('*.html')):
+        if page.stem not in live:
+            changes.remove(page)
+
+    # search index: oldest first, so new posts get the highest doc ids
+    for slug, md in sorted(to_index):
+        store.put_search_doc(slug, md_title(md), post_terms(md))
+    write_search_index(store, out/'search', changes)
+    write_output(manifest, changes, out/'search'/'index.html', '', lambda: render_search_page(cfg))
+
+    # games: mirror static directories into docs/games
+    game_dirs = []
+    for d in sorted(glob.glob('games/*')):
+        base = os.path.basename(d)
+        if base.startswith('_'):
+            continue
+        if not os.path.isdir(d):
+            continue
+        if os.path.exists(os.path.join(d, 'index.html')):
+            game_dirs.append(base)
+
+    # unchanged files are skipped on size + mtime without being read
+    mirror = Mirror(changes, link=cfg.get('mirror_link') or 'copy')
+    for gd in game_dirs:
+        mirror.sync(Path('games')/gd, out/'games'/gd)
+    for stale in sorted(set(os.listdir(out/'games')) - set(game_dirs) - {'index.html'}):
+        mirror.remove_tree(out/'games'/stale)
+    store.replace_games(game_dirs)
+
+    write_output(manifest, changes, out/'games'/'index.html', sha256_json(game_dirs),
+                 lambda: render_games_index(game_dirs, cfg))
+
+    # catalog: stream catalog/index.json into fixed-size shards + manifest.json
+    # (rebuilt only when the index changed; unchanged shards are not rewritten)
+    catalog_index = Path('catalog')/'index.json'
+    catalog_dst = out/'catalog'
+    catalog_dst.mkdir(parents=True, exist_ok=True)
+    # the index is only hashed when its size or mtime moved since the last build
+    st = catalog_index.stat() if catalog_index.exists() else None
+    cat_stat = f'{st.st_size}:{st.st_mtime_ns}' if st else ''
+    cat_hash = store.get_state('catalog_hash')
+    if cat_hash is None or store.get_state('catalog_stat') != cat_stat:
+        cat_hash = sha256_file(catalog_index) if st else ''
+        if store.get_state('catalog_hash') != cat_hash:
+            store.replace_catalog(iter_catalog_items(catalog_index), cat_hash)
+        store.set_state('catalog_stat', cat_stat)
+    if not manifest.is_fresh(catalog_dst/'manifest.json', cat_hash):
+        shard_manifest = write_shards(lambda: iter_catalog_items(catalog_index), catalog_dst, changes)
+        # facet/term posting lists for client-side filtering
+        build_facets(iter_catalog_items(catalog_index), catalog_dst/'facets', changes,
+                     total=shard_manifest['total'])
+        manifest.record(catalog_dst/'manifest.json', cat_hash)
+    # the page itself is static; rows come from the shards at runtime
+    write_output(manifest, changes, catalog_dst/'index.html', '', lambda: render_catalog_page(cfg))
+    # the page no longer needs the full source catalog, but catalog/index.json
+    # and items/ are a published download URL: keep mirroring them for one
+    # more release so external readers can move to the shards first
+    if catalog_index.is_file():
+        with os.scandir(catalog_index.parent) as it:
+            src_index = next(e for e in it if e.name == catalog_index.name)
+        mirror.copy_file(src_index, str(catalog_dst/'index.json'))
+    elif (catalog_dst/'index.json').exists():
+        changes.remove(catalog_dst/'index.json')
+    if (Path('catalog')/'items').is_dir():
+        mirror.sync(Path('catalog')/'items', catalog_dst/'items')
+    elif (catalog_dst/'items').exists():
+        mirror.remove_tree(catalog_dst/'items')
+
+    # briefs: scan external brief directories and render pages + index
+    build_briefs(cfg, out, manifest, executor, changes, store)
+    build_briefs_archive(cfg, out, manifest, changes, store)
+
+    # aggregate pages come from the metadata store, not from re-reading posts
+    build_post_indexes(cfg, out, manifest, changes, store)
+
+    # robots.txt + sitemap index/shards + feeds for SEO
+    write_output(manifest, changes, out/'robots.txt', '', lambda: render_robots(cfg))
+    base = (cfg.get('base_url') or '').rstrip('/')
+    build_sitemaps(sitemap_urls(out, manifest, store, cfg) if base else [], out, changes, store,
+                   base=base, today=build_date(cfg))
+    build_feeds(cfg, out, manifest, changes, store)
+
+    return {'posts': len(posts), 'rendered_posts': len(pending)}
 
 if __name__=='__main__':
     main()
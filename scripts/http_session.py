@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Small keep-alive HTTP client on top of http.client (no external deps).
+
+urllib.request opens a fresh TCP/TLS connection per request. HttpSession keeps
+idle connections per (scheme, host, port) and hands them out again, so a
+search + several HEADs + a download against the same host share handshakes.
+It is thread-safe: concurrent requests simply check out separate connections.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import http.client
+import threading
+import urllib.parse
+
+USER_AGENT = "openclaw-pm-fieldnotes/1.0"
+MAX_REDIRECTS = 5
+
+
+class HttpError(Exception):
+    def __init__(self, url: str, status: int, reason: str = ""):
+        super().__init__(f"HTTP {status} {reason} for {url}".strip())
+        self.url = url
+        self.status = status
+
+
+class HttpSession:
+    def __init__(self, *, timeout: float = 30, max_idle_per_host: int = 8):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: dict[tuple, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, key: tuple, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=timeout)
+
+    def _acquire(self, key: tuple, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self._connect(key, timeout), False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @contextlib.contextmanager
+    def open(self, method: str, url: str, *, headers: dict | None = None,
+             timeout: float | None = None):
+        """Context manager yielding an http.client.HTTPResponse (redirects followed).
+
+        Raises HttpError for 4xx/5xx. The connection goes back to the pool if
+        the body was read to the end, otherwise it is closed.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        hdrs = {"User-Agent": USER_AGENT}
+        hdrs.update(headers or {})
+        for _ in range(MAX_REDIRECTS + 1):
+            u = urllib.parse.urlsplit(url)
+            key = (u.scheme, u.hostname, u.port or (443 if u.scheme == "https" else 80))
+            path = urllib.parse.urlunsplit(("", "", u.path or "/", u.query, ""))
+            conn, reused = self._acquire(key, timeout)
+            while True:
+                try:
+                    conn.request(method, path, headers=hdrs)
+                    resp = conn.getresponse()
+                    break
+                except (http.client.HTTPException, OSError):
+                    conn.close()
+                    if not reused:
+                        raise
+                # idle connection was dropped by the server; retry once on a fresh one
+                conn, reused = self._connect(key, timeout), False
+
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                resp.read()
+                self._finish(key, conn, resp)
+                url = urllib.parse.urljoin(url, resp.getheader("Location"))
+                if resp.status == 303:
+                    method = "GET"
+                continue
+            if resp.status >= 400:
+                resp.read()
+                self._finish(key, conn, resp)
+                raise HttpError(url, resp.status, resp.reason)
+            try:
+                yield resp
+            finally:
+                self._finish(key, conn, resp)
+            return
+        raise HttpError(url, 310, "too many redirects")
+
+    def _finish(self, key: tuple, conn: http.client.HTTPConnection,
+                resp: http.client.HTTPResponse) -> None:
+        if resp.isclosed() and not resp.will_close:
+            self._release(key, conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
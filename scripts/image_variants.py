@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Responsive derivatives for images under docs/assets/images.
+
+For every original image this writes resized copies at a few widths (never
+upscaled) in the original format plus WebP, named
+<stem>.<srchash8>-<width>w.<ext>, and records them in
+docs/assets/images/variants.json. Derivatives are keyed by the source hash:
+an unchanged original is never re-encoded, a replaced one gets new files and
+the old ones are removed.
+
+render_post() reads variants.json to turn a plain <img src="assets/images/...">
+into a <picture> with WebP/JPEG srcset, sizes and explicit width/height.
+
+Pillow is optional. Without it the stage only loads the existing
+variants.json, so pages still get srcset for images derived elsewhere. A
+Pillow built without WebP support writes only the original-format copies
+(webp: null in the index); they gain WebP siblings once a build has it.
+
+Usage:
+  python3 scripts/image_variants.py [docs/assets/images]
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from build_manifest import sha256_bytes
+
+WIDTHS = (480, 960, 1440)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+INDEX_NAME = 'variants.json'
+# layout column is 860px wide (--max in the theme) minus 2x18px padding
+SIZES = '(max-width: 860px) 100vw, 824px'
+
+ORIGINAL_EXTS = ('.jpg', '.jpeg', '.png', '.webp')
+_DERIVED = re.compile(r'\.[0-9a-f]{8}-\d+w\.(?:jpe?g|png|webp)$')
+_IMG_SRC = re.compile(r'\ssrc="assets/images/([^"]+)"')
+
+
+def load_index(images_dir: Path) -> dict:
+    try:
+        return json.loads((images_dir / INDEX_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _files(variant: dict) -> list[str]:
+    return [variant['src']] + ([variant['webp']] if variant['webp'] else [])
+
+
+def _derive(path: Path, sha: str, widths, Image, ImageOps, webp: bool) -> dict | None:
+    """Encode all derivatives of one original. None if it isn't a raster image."""
+    try:
+        im = Image.open(path)
+        im.load()
+    except Exception as e:
+        print(f"image_variants: skip {path.name}: {e}", file=sys.stderr)
+        return None
+    im = ImageOps.exif_transpose(im)
+    w, h = im.size
+    is_png = path.suffix.lower() == '.png'
+    if not is_png and im.mode not in ('RGB', 'L'):
+        im = im.convert('RGB')
+
+    variants = []
+    for target in sorted({min(tw, w) for tw in widths}):
+        th = max(1, round(h * target / w))
+        resized = im if target == w else im.resize((target, th), Image.LANCZOS)
+        stem = f"{path.stem}.{sha[:8]}-{target}w"
+        fallback = stem + ('.png' if is_png else '.jpg')
+        if is_png:
+            resized.save(path.parent / fallback, 'PNG', optimize=True)
+        else:
+            resized.save(path.parent / fallback, 'JPEG', quality=JPEG_QUALITY,
+                         optimize=True, progressive=True)
+        webp_name = None
+        if webp:
+            webp_name = stem + '.webp'
+            resized.save(path.parent / webp_name, 'WEBP', quality=WEBP_QUALITY, method=6)
+        variants.append({'w': target, 'h': th, 'src': fallback, 'webp': webp_name})
+    return {'width': w, 'height': h, 'variants': variants}
+
+
+def build_variants(images_dir: Path, widths=WIDTHS,
+                   stat_cache: Path = Path('.cache/build/image_stats.json'),
+                   changes=None) -> dict:
+    """Bring derivatives in images_dir up to date and return the variants index.
+
+    The index maps original file name -> {sha256, width, height,
+    variants: [{w, h, src, webp}, ...]} (narrowest first). It is committed
+    with the images, so (size, mtime) shortcuts for skipping the hash live in
+    the separate, uncommitted stat_cache. Files written or removed are
+    reported to changes (a build_manifest.OutputChanges) if given.
+    """
+    index = load_index(images_dir)
+    if not images_dir.is_dir():
+        return index
+    try:
+        from PIL import Image, ImageOps, features
+    except ImportError:
+        print("image_variants: Pillow not installed; keeping existing derivatives", file=sys.stderr)
+        return index
+    webp = features.check('webp')
+    if not webp:
+        print("image_variants: Pillow built without WebP; writing JPEG/PNG derivatives only", file=sys.stderr)
+
+    try:
+        stats = json.loads(stat_cache.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        stats = {}
+    new_stats: dict[str, list] = {}
+    fresh: dict[str, dict] = {}
+    existing = {p.name for p in images_dir.iterdir()}
+    for path in sorted(images_dir.iterdir()):
+        name = path.name
+        if not path.is_file() or _DERIVED.search(name) or path.suffix.lower() not in ORIGINAL_EXTS:
+            continue
+        st = path.stat()
+        cached = stats.get(name)
+        if cached and cached[:2] == [st.st_size, st.st_mtime_ns]:
+            sha = cached[2]
+        else:
+            sha = sha256_bytes(path.read_bytes())
+        new_stats[name] = [st.st_size, st.st_mtime_ns, sha]
+        prev = index.get(name)
+        if prev and prev.get('sha256') == sha and all(
+                (images_dir / f).exists() for v in prev['variants'] for f in _files(v)) and (
+                not webp or all(v['webp'] for v in prev['variants'])):
+            fresh[name] = prev
+            continue
+        # non-images (Commons sometimes hands back a PDF) are remembered with
+        # no variants so they are not re-read on every build
+        entry = _derive(path, sha, widths, Image, ImageOps, webp) or {'variants': []}
+        fresh[name] = dict(entry, sha256=sha)
+        if changes is not None:
+            for v in entry['variants']:
+                for f in _files(v):
+                    changes.note(images_dir / f, 'changed' if f in existing else 'created')
+
+    # drop derivatives no original refers to any more
+    keep = {f for e in fresh.values() for v in e['variants'] for f in _files(v)}
+    for path in images_dir.iterdir():
+        if _DERIVED.search(path.name) and path.name not in keep:
+            path.unlink()
+            if changes is not None:
+                changes.note(path, 'deleted')
+
+    if fresh != index:
+        tmp = images_dir / (INDEX_NAME + '.tmp')
+        tmp.write_text(json.dumps(fresh, ensure_ascii=False, sort_keys=True, indent=1) + '\n',
+                       encoding='utf-8')
+        os.replace(tmp, images_dir / INDEX_NAME)
+        if changes is not None:
+            changes.note(images_dir / INDEX_NAME, 'changed' if INDEX_NAME in existing else 'created')
+    if new_stats != stats:
+        stat_cache.parent.mkdir(parents=True, exist_ok=True)
+        stat_cache.write_text(json.dumps(new_stats), encoding='utf-8')
+    return fresh
+
+
+def referenced(md: str, index: dict) -> dict:
+    """Variant entries for the images a post embeds (part of its build key)."""
+    return {name: index[name] for name in _IMG_SRC.findall(md) if name in index}
+
+
+def responsive_img(tag: str, index: dict) -> str:
+    """Upgrade a plain <img src="assets/images/NAME" ...> using the variants index.
+
+    Returns the tag unchanged when it already has a srcset or NAME has no
+    derivatives.
+    """
+    m = _IMG_SRC.search(tag)
+    if not m or ' srcset=' in tag:
+        return tag
+    entry = index.get(m.group(1))
+    if not entry or not entry.get('variants'):
+        return tag
+    variants = entry['variants']
+    largest = variants[-1]
+    jpg_set = ', '.join(f"assets/images/{v['src']} {v['w']}w" for v in variants)
+    img = tag[:m.start()] + (
+        f' src="assets/images/{html.escape(largest["src"])}"'
+        f' srcset="{html.escape(jpg_set)}" sizes="{SIZES}"'
+        f' width="{largest["w"]}" height="{largest["h"]}"'
+    ) + tag[m.end():]
+    if not all(v['webp'] for v in variants):
+        return img
+    webp_set = ', '.join(f"assets/images/{v['webp']} {v['w']}w" for v in variants)
+    return (f'<picture><source type="image/webp" srcset="{html.escape(webp_set)}" sizes="{SIZES}">'
+            f'{img}</picture>')
+
+
+def main() -> int:
+    images_dir = Path(sys.argv[1] if len(sys.argv) > 1 else 'docs/assets/images')
+    index = build_variants(images_dir)
+    n = sum(len(e['variants']) for e in index.values())
+    print(f"{len(index)} images, {n} derivative widths")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
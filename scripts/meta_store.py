@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Persistent metadata store for generate.py (SQLite, stdlib only).
+
+One compact row per post, brief, game and catalog item: slug/id, title,
+excerpt, date, source hash and output path. Rows are updated incrementally
+as sources are (re)rendered, and the aggregate pages (home index, RSS,
+sitemap, briefs index) are generated from queries instead of re-reading the
+archive. The post search index (post_search.py) keeps its postings here too.
+
+The database lives next to the build manifest (.cache/build/meta.sqlite) and
+is not committed; it is rebuilt from the sources if missing.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import re
+import sqlite3
+from pathlib import Path
+
+SCHEMA_VERSION = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+  slug TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  excerpt TEXT NOT NULL,
+  date TEXT,
+  src_hash TEXT NOT NULL,
+  path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS briefs (
+  kind TEXT NOT NULL,
+  date TEXT NOT NULL,
+  label TEXT NOT NULL,
+  rank INTEGER NOT NULL,
+  src_hash TEXT NOT NULL,
+  path TEXT NOT NULL,
+  size INTEGER NOT NULL DEFAULT 0,
+  mtime_ns INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (kind, date)
+);
+CREATE TABLE IF NOT EXISTS games (
+  slug TEXT PRIMARY KEY,
+  date TEXT,
+  path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalog (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  url TEXT NOT NULL,
+  source TEXT NOT NULL,
+  date TEXT,
+  src_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sitemap (
+  loc TEXT PRIMARY KEY,
+  hash TEXT NOT NULL,
+  lastmod TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_docs (
+  doc INTEGER PRIMARY KEY AUTOINCREMENT,
+  slug TEXT NOT NULL UNIQUE,
+  title TEXT NOT NULL,
+  date TEXT
+);
+CREATE TABLE IF NOT EXISTS search_terms (
+  slot INTEGER NOT NULL,
+  term TEXT NOT NULL,
+  doc INTEGER NOT NULL,
+  PRIMARY KEY (slot, term, doc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS posts_date ON posts(date);
+CREATE INDEX IF NOT EXISTS catalog_date ON catalog(date);
+CREATE INDEX IF NOT EXISTS search_terms_doc ON search_terms(doc);
+"""
+
+_SLUG_DATE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:-|$)')
+_SLUG_WEEK = re.compile(r'^(\d{4})-ww(\d{2})(?:-|$)')
+
+
+def slug_date(slug: str) -> str | None:
+    """ISO date a slug starts with: YYYY-MM-DD-..., or the Monday of an ISO
+    week for game slugs (YYYY-wwNN-...). None if the slug carries no date."""
+    try:
+        m = _SLUG_DATE.match(slug)
+        if m:
+            return dt.date(*map(int, m.groups())).isoformat()
+        m = _SLUG_WEEK.match(slug)
+        if m:
+            return dt.date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1).isoformat()
+    except ValueError:
+        pass
+    return None
+
+
+def parse_published(value: str) -> str | None:
+    """ISO date of a catalog published_at (RFC 2822 from RSS, or ISO 8601)."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return dt.date.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        pass
+    try:
+        return email.utils.parsedate_to_datetime(value).date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+class MetaStore:
+    """Thin wrapper around the SQLite database; call commit() at the end of a build."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        # slugs whose row was added, changed or removed in this session; lets
+        # the paginated index and date archives re-render only affected pages
+        self.dirty_posts: set[str] = set()
+        self.all_posts_dirty = False
+        # search shards / doc ids touched this session (see post_search.py)
+        self.dirty_slots: set[int] = set()
+        self.dirty_docs: set[int] = set()
+        # set by replace_catalog (see there); None when the catalog was not reloaded
+        self.catalog_changed_from: int | None = None
+        self.catalog_previous: tuple | None = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            # sqlite_sequence (AUTOINCREMENT bookkeeping) cannot be dropped;
+            # SQLite clears its rows along with the tables they belong to
+            for (name,) in self.db.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'").fetchall():
+                self.db.execute(f'DROP TABLE "{name}"')
+            self.db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.db.executescript(_SCHEMA)
+        # a new (or wiped) database: everything derived from it is suspect
+        self.all_posts_dirty = self.post_count() == 0
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def reset(self) -> None:
+        """Forget everything (forces every source to be read again)."""
+        for table in ('posts', 'briefs', 'games', 'catalog', 'sitemap', 'state', 'search_docs', 'search_terms'):
+            self.db.execute(f'DELETE FROM {table}')
+        self.db.execute("DELETE FROM sqlite_sequence WHERE name = 'search_docs'")
+        self.all_posts_dirty = True
+
+    def get_state(self, key: str) -> str | None:
+        row = self.db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        self.db.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (key, value))
+
+    # -- posts -------------------------------------------------------------
+
+    def post_hash(self, slug: str) -> str | None:
+        row = self.db.execute('SELECT src_hash FROM posts WHERE slug = ?', (slug,)).fetchone()
+        return row[0] if row else None
+
+    def put_post(self, slug: str, title: str, excerpt: str, src_hash: str, path: str) -> None:
+        row = self.db.execute('SELECT title, excerpt FROM posts WHERE slug = ?', (slug,)).fetchone()
+        if row != (title, excerpt):
+            self.dirty_posts.add(slug)
+        self.db.execute(
+            'INSERT OR REPLACE INTO posts (slug, title, excerpt, date, src_hash, path) VALUES (?, ?, ?, ?, ?, ?)',
+            (slug, title, excerpt, slug_date(slug), src_hash, path))
+
+    def retain_posts(self, slugs) -> None:
+        """Drop rows for posts whose source is gone."""
+        keep = set(slugs)
+        gone = [s for (s,) in self.db.execute('SELECT slug FROM posts') if s not in keep]
+        self.dirty_posts.update(gone)
+        self.db.executemany('DELETE FROM posts WHERE slug = ?', [(s,) for s in gone])
+        for s in gone:
+            self.drop_search_doc(s)
+
+    def recent_posts(self, limit: int | None = None) -> list[tuple]:
+        """[(slug, title, excerpt), ...] newest first."""
+        sql = 'SELECT slug, title, excerpt FROM posts ORDER BY slug DESC'
+        if limit is not None:
+            return self.db.execute(sql + ' LIMIT ?', (limit,)).fetchall()
+        return self.db.execute(sql).fetchall()
+
+    def post_sources(self) -> list[tuple]:
+        """[(slug, date, src_hash), ...] oldest first."""
+        return self.db.execute('SELECT slug, date, src_hash FROM posts ORDER BY slug').fetchall()
+
+    def feed_posts(self) -> list[tuple]:
+        """[(slug, title, excerpt, date), ...] oldest first."""
+        return self.db.execute('SELECT slug, title, excerpt, date FROM posts ORDER BY slug').fetchall()
+
+    def post_count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM posts').fetchone()[0]
+
+    def post_rank(self, slug: str) -> int:
+        """Position of slug in oldest-first order (also for slugs not stored)."""
+        return self.db.execute('SELECT COUNT(*) FROM posts WHERE slug < ?', (slug,)).fetchone()[0]
+
+    def posts_range(self, offset: int, limit: int) -> list[tuple]:
+        """[(slug, title, excerpt), ...] in oldest-first order."""
+        return self.db.execute('SELECT slug, title, excerpt FROM posts ORDER BY slug LIMIT ? OFFSET ?',
+                               (limit, offset)).fetchall()
+
+    def posts_in_month(self, month: str) -> list[tuple]:
+        """[(slug, title, excerpt), ...] dated in month ('YYYY-MM'), newest first."""
+        return self.db.execute(
+            'SELECT slug, title, excerpt FROM posts WHERE date >= ? AND date < ? ORDER BY slug DESC',
+            (month + '-01', month + '-32')).fetchall()
+
+    def month_counts(self, year: str | None = None) -> list[tuple]:
+        """[('YYYY-MM', n), ...] newest first, optionally within one year."""
+        sql = "SELECT substr(date, 1, 7) AS m, COUNT(*) FROM posts WHERE date IS NOT NULL"
+        args: tuple = ()
+        if year is not None:
+            sql += " AND date >= ? AND date < ?"
+            args = (year + '-01-01', year + '-13')
+        return self.db.execute(sql + " GROUP BY m ORDER BY m DESC", args).fetchall()
+
+    def year_counts(self) -> list[tuple]:
+        """[('YYYY', n), ...] newest first."""
+        return self.db.execute(
+            "SELECT substr(date, 1, 4) AS y, COUNT(*) FROM posts WHERE date IS NOT NULL"
+            " GROUP BY y ORDER BY y DESC").fetchall()
+
+    # -- post search ---------------------------------------------------------
+
+    def search_doc_count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM search_docs').fetchone()[0]
+
+    def put_search_doc(self, slug: str, title: str, terms) -> int:
+        """Index one post; terms: {(slot, term), ...}. Returns its doc id.
+
+        Doc ids are assigned once per slug and never reused, so editing or
+        adding a post only rewrites the buckets whose terms changed.
+        """
+        row = self.db.execute('SELECT doc, title FROM search_docs WHERE slug = ?', (slug,)).fetchone()
+        if row is None:
+            doc = self.db.execute('INSERT INTO search_docs (slug, title, date) VALUES (?, ?, ?)',
+                                  (slug, title, slug_date(slug))).lastrowid
+            self.dirty_docs.add(doc)
+            old = set()
+        else:
+            doc = row[0]
+            if row[1] != title:
+                self.db.execute('UPDATE search_docs SET title = ? WHERE doc = ?', (title, doc))
+                self.dirty_docs.add(doc)
+            old = set(self.db.execute('SELECT slot, term FROM search_terms WHERE doc = ?', (doc,)))
+        terms = set(terms)
+        gone, new = old - terms, terms - old
+        self.db.executemany('DELETE FROM search_terms WHERE slot = ? AND term = ? AND doc = ?',
+                            [(b, t, doc) for b, t in gone])
+        self.db.executemany('INSERT INTO search_terms (slot, term, doc) VALUES (?, ?, ?)',
+                            [(b, t, doc) for b, t in new])
+        self.dirty_slots.update(b for b, _t in gone | new)
+        return doc
+
+    def drop_search_doc(self, slug: str) -> None:
+        row = self.db.execute('SELECT doc FROM search_docs WHERE slug = ?', (slug,)).fetchone()
+        if row is None:
+            return
+        doc = row[0]
+        self.dirty_slots.update(
+            b for (b,) in self.db.execute('SELECT DISTINCT slot FROM search_terms WHERE doc = ?', (doc,)))
+        self.dirty_docs.add(doc)
+        self.db.execute('DELETE FROM search_terms WHERE doc = ?', (doc,))
+        self.db.execute('DELETE FROM search_docs WHERE doc = ?', (doc,))
+
+    def search_slots(self) -> list[int]:
+        """Slots that hold at least one posting."""
+        return [b for (b,) in self.db.execute('SELECT DISTINCT slot FROM search_terms ORDER BY slot')]
+
+    def search_posting_count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM search_terms').fetchone()[0]
+
+    def search_postings(self, lo: int, hi: int):
+        """(term, doc) rows with lo <= slot < hi, ordered by term then doc."""
+        return self.db.execute('SELECT term, doc FROM search_terms WHERE slot >= ? AND slot < ?'
+                               ' ORDER BY term, doc', (lo, hi))
+
+    def search_docs(self, lo: int, hi: int) -> list[tuple]:
+        """[(doc, slug, title, date), ...] for lo <= doc < hi."""
+        return self.db.execute('SELECT doc, slug, title, date FROM search_docs WHERE doc >= ? AND doc < ?'
+                               ' ORDER BY doc', (lo, hi)).fetchall()
+
+    def max_search_doc(self) -> int:
+        return self.db.execute('SELECT COALESCE(MAX(doc), 0) FROM search_docs').fetchone()[0]
+
+    # -- briefs ------------------------------------------------------------
+
+    def replace_briefs(self, rows) -> None:
+        """rows: [(kind, date, label, rank, src_hash, path, size, mtime_ns), ...]
+        for every brief found."""
+        self.db.execute('DELETE FROM briefs')
+        self.db.executemany(
+            'INSERT OR REPLACE INTO briefs (kind, date, label, rank, src_hash, path, size, mtime_ns)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def brief_months(self) -> list[tuple]:
+        """[('YYYY-MM', number of brief dates), ...] newest first."""
+        return self.db.execute(
+            'SELECT substr(date, 1, 7) AS m, COUNT(DISTINCT date) FROM briefs GROUP BY m ORDER BY m DESC').fetchall()
+
+    def briefs_since(self, lo: str, hi: str = '9999') -> list[tuple]:
+        """[(date, label, kind, path), ...] with lo <= date < hi, newest first."""
+        return self.db.execute(
+            'SELECT date, label, kind, path FROM briefs WHERE date >= ? AND date < ? ORDER BY date DESC, rank',
+            (lo, hi)).fetchall()
+
+    def recent_brief_dates(self, limit: int) -> list[str]:
+        return [d for (d,) in self.db.execute(
+            'SELECT DISTINCT date FROM briefs ORDER BY date DESC LIMIT ?', (limit,))]
+
+    def brief_dates(self) -> list[tuple]:
+        """[(date, kind), ...] newest first."""
+        return self.db.execute('SELECT date, kind FROM briefs ORDER BY date DESC, rank').fetchall()
+
+    def brief_stats(self) -> dict:
+        """{(kind, date): (size, mtime_ns, src_hash)} of the briefs last seen."""
+        return {(k, d): (size, mtime, h) for k, d, size, mtime, h in self.db.execute(
+            'SELECT kind, date, size, mtime_ns, src_hash FROM briefs')}
+
+    # -- games -------------------------------------------------------------
+
+    def replace_games(self, slugs) -> None:
+        self.db.execute('DELETE FROM games')
+        self.db.executemany('INSERT INTO games (slug, date, path) VALUES (?, ?, ?)',
+                            [(s, slug_date(s), f'games/{s}/index.html') for s in slugs])
+
+    def games(self) -> list[str]:
+        return [s for (s,) in self.db.execute('SELECT slug FROM games ORDER BY slug')]
+
+    # -- sitemap -------------------------------------------------------------
+
+    def sitemap_entries(self) -> dict:
+        """{loc: (content hash, lastmod)} as of the previous build."""
+        return {loc: (h, lastmod) for loc, h, lastmod in self.db.execute('SELECT loc, hash, lastmod FROM sitemap')}
+
+    def replace_sitemap(self, rows) -> None:
+        """rows: [(loc, hash, lastmod), ...] for every URL in the sitemaps."""
+        self.db.execute('DELETE FROM sitemap')
+        self.db.executemany('INSERT OR REPLACE INTO sitemap (loc, hash, lastmod) VALUES (?, ?, ?)', rows)
+
+    # -- catalog -----------------------------------------------------------
+
+    def replace_catalog(self, items, src_hash: str) -> None:
+        """Load catalog items (any iterable) built from a source with src_hash.
+
+        Sets catalog_changed_from to the position (in catalog_feed order) of
+        the first row that was added, edited or removed, and catalog_previous
+        to the (src_hash, row count) the table held before.
+        """
+        self.catalog_previous = (self.get_state('catalog_hash'), self.catalog_count())
+        self.db.execute('DROP TABLE IF EXISTS temp.catalog_old')
+        self.db.execute('CREATE TEMP TABLE catalog_old AS SELECT id, title, url, source, date FROM catalog')
+        self.db.execute('DELETE FROM catalog')
+        rows = (
+            (it.get('id') or it.get('url'), it.get('title') or it.get('name') or 'Untitled',
+             it.get('url') or '', it.get('source_name') or it.get('source') or '',
+             parse_published(it.get('published_at') or ''), src_hash)
+            for it in items if it.get('id') or it.get('url')
+        )
+        self.db.executemany(
+            'INSERT OR REPLACE INTO catalog (id, title, url, source, date, src_hash) VALUES (?, ?, ?, ?, ?, ?)',
+            rows)
+        self.set_state('catalog_hash', src_hash)
+        cols = 'id, title, url, source, date'
+        first = self.db.execute(
+            f"SELECT COALESCE(date, ''), id FROM ("
+            f"  SELECT * FROM (SELECT {cols} FROM temp.catalog_old EXCEPT SELECT {cols} FROM catalog)"
+            f"  UNION ALL"
+            f"  SELECT * FROM (SELECT {cols} FROM catalog EXCEPT SELECT {cols} FROM temp.catalog_old)"
+            f") ORDER BY 1, 2 LIMIT 1").fetchone()
+        self.db.execute('DROP TABLE temp.catalog_old')
+        self.catalog_changed_from = self.catalog_count() if first is None else self.db.execute(
+            "SELECT COUNT(*) FROM catalog WHERE (COALESCE(date, ''), id) < (?, ?)", first).fetchone()[0]
+
+    def catalog_feed(self, offset: int = 0):
+        """Cursor over (id, title, url, source, date) oldest first (undated
+        items first), skipping the first offset rows."""
+        return self.db.execute(
+            "SELECT id, title, url, source, date FROM catalog ORDER BY COALESCE(date, ''), id LIMIT -1 OFFSET ?",
+            (offset,))
+
+    def catalog_count(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM catalog').fetchone()[0]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Incremental directory mirroring for the static sections of docs/ (games).
+
+mirror(src, dst) makes dst an exact copy of src while touching as little
+as possible:
+
+- a file whose size and mtime match the source is skipped without being
+  opened (copies carry the source mtime);
+- if only the mtime differs (e.g. after a git checkout), both files are
+  hashed and an identical file just gets its mtime fixed;
+- changed files are replaced atomically (temp file + rename), as a reflink,
+  a hardlink or a plain copy depending on `link`;
+- files and empty directories that src no longer has are removed.
+
+Reflinks (copy-on-write clones) fall back to plain copies where the
+filesystem refuses them. Hardlinks share the inode with the source, so a
+later in-place edit of the source changes the mirror without being
+reported; they suit throwaway trees, not docs/.
+
+Every created/changed/deleted path is reported to an OutputChanges, so
+publishers stage exactly those.
+
+Usage:
+  python3 scripts/mirror.py SRC DST [--link copy|reflink|hardlink]
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import json
+import os
+import shutil
+from pathlib import Path
+
+from build_manifest import OutputChanges, sha256_file
+
+LINK_MODES = ('copy', 'reflink', 'hardlink')
+_FICLONE = 0x40049409  # linux/fs.h: ioctl(dst_fd, FICLONE, src_fd)
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EINVAL, errno.ENOTTY, errno.EOPNOTSUPP, errno.ENOSYS}
+
+
+class Mirror:
+    """One mirroring session; remembers which link modes the filesystem refused."""
+
+    def __init__(self, changes: OutputChanges | None = None, *, link: str = 'copy'):
+        if link not in LINK_MODES:
+            raise ValueError(f"link must be one of {', '.join(LINK_MODES)}")
+        self.changes = changes if changes is not None else OutputChanges()
+        self.link = link
+        self.stats = {'copied': 0, 'linked': 0, 'reflinked': 0, 'skipped': 0, 'hashed': 0, 'removed': 0}
+
+    def _place(self, src: str, tmp: str) -> None:
+        if self.link == 'hardlink':
+            try:
+                os.link(src, tmp)
+                self.stats['linked'] += 1
+                return
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                self.link = 'copy'  # e.g. src and dst on different devices
+        if self.link == 'reflink':
+            try:
+                import fcntl
+                with open(src, 'rb') as s, open(tmp, 'wb') as d:
+                    fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                shutil.copystat(src, tmp)
+                self.stats['reflinked'] += 1
+                return
+            except (ImportError, OSError) as e:
+                if isinstance(e, OSError) and e.errno not in _UNSUPPORTED:
+                    raise
+                self.link = 'copy'
+        shutil.copy2(src, tmp)
+        self.stats['copied'] += 1
+
+    def _same(self, src: os.DirEntry, dst: str) -> bool:
+        try:
+            st = os.stat(dst)
+        except FileNotFoundError:
+            return False
+        s = src.stat()
+        if (s.st_ino, s.st_dev) == (st.st_ino, st.st_dev):
+            return True  # hardlinked
+        if s.st_size != st.st_size:
+            return False
+        if s.st_mtime_ns == st.st_mtime_ns:
+            return True
+        self.stats['hashed'] += 1
+        if sha256_file(src.path) != sha256_file(dst):
+            return False
+        os.utime(dst, ns=(st.st_atime_ns, s.st_mtime_ns))
+        return True
+
+    def copy_file(self, src: os.DirEntry, dst: str) -> None:
+        if self._same(src, dst):
+            self.stats['skipped'] += 1
+            return
+        status = 'changed' if os.path.lexists(dst) else 'created'
+        tmp = dst + '.mirror-tmp'
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        self._place(src.path, tmp)
+        os.replace(tmp, dst)
+        self.changes.note(dst, status)
+
+    def remove_tree(self, path: str | Path) -> None:
+        """Delete path (file or directory), reporting every removed file."""
+        path = str(path)
+        if os.path.isdir(path) and not os.path.islink(path):
+            with os.scandir(path) as it:
+                entries = list(it)
+            for e in entries:
+                self.remove_tree(e.path)
+            os.rmdir(path)
+        elif os.path.lexists(path):
+            self.changes.remove(path)
+            self.stats['removed'] += 1
+
+    def sync(self, src: str | Path, dst: str | Path, keep=()) -> None:
+        """Mirror directory src into dst. keep: paths relative to dst that are
+        generated there and must survive even though src lacks them."""
+        keep = {os.path.normpath(k) for k in keep}
+        self._sync(str(src), str(dst), '', keep)
+
+    def _sync(self, src: str, dst: str, rel: str, keep: set) -> None:
+        os.makedirs(dst, exist_ok=True)
+        with os.scandir(src) as it:
+            wanted = {e.name: e for e in it}
+        with os.scandir(dst) as it:
+            present = {e.name: e for e in it}
+        for name in sorted(present):
+            e = present[name]
+            r = os.path.join(rel, name)
+            s = wanted.get(name)
+            if r in keep:
+                continue
+            if s is None or s.is_dir() != (e.is_dir() and not e.is_symlink()):
+                self.remove_tree(e.path)
+        for name in sorted(wanted):
+            s = wanted[name]
+            target = os.path.join(dst, name)
+            if s.is_dir():
+                self._sync(s.path, target, os.path.join(rel, name), keep)
+            elif s.is_file():
+                self.copy_file(s, target)
+
+
+def mirror(src: str | Path, dst: str | Path, changes: OutputChanges | None = None, *,
+           keep=(), link: str = 'copy') -> dict:
+    """Mirror src into dst (see module docstring). Returns the stats counters."""
+    m = Mirror(changes, link=link)
+    m.sync(src, dst, keep)
+    return m.stats
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Mirror a directory, copying only what changed.')
+    ap.add_argument('src')
+    ap.add_argument('dst')
+    ap.add_argument('--link', choices=LINK_MODES, default='copy',
+                    help='place changed files as plain copies, reflinks or hardlinks')
+    args = ap.parse_args(argv)
+    changes = OutputChanges()
+    stats = mirror(args.src, args.dst, changes, link=args.link)
+    print(json.dumps(dict(stats, **{k: len(v) for k, v in changes.as_dict().items()})))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Client-side post search: an inverted index over character bigrams.
+
+Posts are Korean with English terms mixed in, and Korean has no reliable
+word boundaries (particles stick to nouns), so Hangul runs are indexed as
+overlapping syllable bigrams and Latin/digit runs as whole lowercase words:
+
+  "리드타임을 KPI로" -> 리드, 드타, 타임, 임을, kpi, 로
+
+A query is tokenized the same way (in the search page's JS) and matches
+the posts that contain every token. Output under docs/search/:
+
+  manifest.json   {"version", "slots", "buckets", "chunk", "docs", "shards": [...]}
+  t/<bucket>.json {term: posting list} for the terms of one bucket
+  d/<n>.json      [[doc, slug, title, date], ...] for docs n*CHUNK..
+
+A term's slot is FNV-1a of its first two characters modulo SLOTS (a Hangul
+bigram is its own prefix); the metadata store (meta_store.py) keeps it
+with every posting. Buckets are equal, contiguous slot ranges, and their
+count is the power of two that keeps each one near POSTINGS_PER_BUCKET, so
+shards stay small as the archive grows; when the count changes the whole
+index is rewritten.
+
+A posting list is the sorted doc ids as gaps (first id, then differences),
+each a LEB128 varint, in one unpadded base64 string. Doc ids are assigned
+once per post and never reused, so adding or editing a post rewrites only
+the buckets whose terms changed and the one doc chunk the post lives in.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from catalog_facets import delta, fnv1a
+
+# upper bound on the bucket count; a power of two
+SLOTS = 4096
+# a Korean post carries ~1-2k distinct bigrams, so a bucket covers about ten
+# posts' worth of terms and stays a few tens of KB
+POSTINGS_PER_BUCKET = 16384
+CHUNK = 128
+MANIFEST_VERSION = 2
+
+_RUN = re.compile(r'[가-힣]+|[a-z0-9]+')
+_TAG = re.compile(r'<[^>]+>')
+_URL = re.compile(r'\]\([^)\s]*\)|https?://\S+')
+
+
+def tokenize(text: str) -> set[str]:
+    """Distinct search tokens of text (mirrored in the search page's JS)."""
+    out: set[str] = set()
+    for run in _RUN.findall(unicodedata.normalize('NFKC', text).lower()):
+        if run[0] >= '가':
+            if len(run) == 1:
+                out.add(run)
+            out.update(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) > 1:
+            out.add(run)
+    return out
+
+
+def slot(term: str) -> int:
+    """Prefix hash of term (mirrored in the search page's JS)."""
+    return fnv1a(term[:2]) % SLOTS
+
+
+def post_terms(md: str) -> set[tuple[int, str]]:
+    """(slot, term) pairs for a post's markdown; markup and URLs are skipped."""
+    text = _URL.sub(']', _TAG.sub(' ', md))
+    return {(slot(t), t) for t in tokenize(text)}
+
+
+def bucket_count(postings: int) -> int:
+    buckets = 1
+    while buckets < SLOTS and buckets * POSTINGS_PER_BUCKET < postings:
+        buckets *= 2
+    return buckets
+
+
+def encode_postings(ids) -> str:
+    """Sorted doc ids as unpadded base64 of LEB128 varint gaps."""
+    out = bytearray()
+    for gap in delta(ids):
+        while gap > 0x7f:
+            out.append(gap & 0x7f | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return base64.b64encode(out).decode('ascii').rstrip('=')
+
+
+def _dump(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def write_search_index(store, out_dir: Path, changes) -> dict:
+    """Write the shards the store marked dirty (all of them on a fresh store,
+    when out_dir has no manifest yet or the bucket count changed) and the
+    manifest. Returns the manifest."""
+    buckets = bucket_count(store.search_posting_count())
+    full = (not (out_dir/'manifest.json').exists() or store.all_posts_dirty
+            or store.get_state('search_buckets') != str(buckets))
+    (out_dir/'t').mkdir(parents=True, exist_ok=True)
+    (out_dir/'d').mkdir(parents=True, exist_ok=True)
+
+    width = SLOTS // buckets
+    for b in range(buckets) if full else sorted({s // width for s in store.dirty_slots}):
+        shard: dict[str, list[int]] = {}
+        for term, doc in store.search_postings(b * width, (b + 1) * width):
+            shard.setdefault(term, []).append(doc)
+        path = out_dir/'t'/f'{b}.json'
+        if shard:
+            changes.write(path, _dump({t: encode_postings(ids) for t, ids in sorted(shard.items())}))
+        elif path.exists():
+            changes.remove(path)
+    store.set_state('search_buckets', str(buckets))
+
+    last = store.max_search_doc() // CHUNK
+    chunks = range(last + 1) if full else sorted({d // CHUNK for d in store.dirty_docs})
+    for n in chunks:
+        rows = store.search_docs(n * CHUNK, (n + 1) * CHUNK)
+        path = out_dir/'d'/f'{n}.json'
+        if rows:
+            changes.write(path, _dump([list(r) for r in rows]))
+        elif path.exists():
+            changes.remove(path)
+
+    if full:
+        # drop shards left over from an earlier index (e.g. a wiped cache)
+        for path in sorted((out_dir/'t').iterdir()):
+            if not path.stem.isdigit() or int(path.stem) >= buckets:
+                changes.remove(path)
+        for path in sorted((out_dir/'d').iterdir()):
+            if not path.stem.isdigit() or int(path.stem) > last:
+                changes.remove(path)
+
+    manifest = {'version': MANIFEST_VERSION, 'slots': SLOTS, 'buckets': buckets, 'chunk': CHUNK,
+                'docs': store.search_doc_count(),
+                'shards': sorted({s // width for s in store.search_slots()})}
+    changes.write(out_dir/'manifest.json', json.dumps(manifest, separators=(',', ':')) + '\n')
+    return manifest
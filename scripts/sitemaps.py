@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Sharded sitemaps with content-derived lastmod.
+
+docs/sitemap.xml is a sitemap index pointing at one shard per section and
+period under docs/sitemaps/:
+
+  pages.xml            home, section landings, archives
+  games.xml            game pages
+  posts-<YYYY>.xml     posts by year of their slug date
+  briefs-<YYYY>.xml    brief pages by year
+
+A shard holding more than MAX_URLS URLs is split (posts-2026-2.xml, ...), which
+keeps every file far below the 50,000 URL / 50 MB protocol limits.
+
+Each URL comes with the hash of the content it was built from (the source
+hash the build manifest keys the page on). The metadata store remembers
+(hash, lastmod) per URL; lastmod moves to the build date only when the hash
+changes. Shard bytes therefore change only when one of their URLs changed,
+and the index's per-shard lastmod tells crawlers which shards to refetch.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+MAX_URLS = 10000
+_XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+_ENTRY = re.compile(r'<loc>([^<]*)</loc><lastmod>([^<]*)</lastmod>')
+
+
+def _existing_lastmods(shard_dir: Path) -> dict:
+    """{loc: lastmod} from shards already on disk; seeds a fresh store so a
+    rebuild without cache keeps the published dates."""
+    out = {}
+    if shard_dir.is_dir():
+        for path in sorted(shard_dir.glob('*.xml')):
+            for loc, lastmod in _ENTRY.findall(path.read_text(encoding='utf-8')):
+                out[loc.replace('&amp;', '&')] = lastmod
+    return out
+
+
+def _urlset(rows: list) -> str:
+    body = ''.join(f'  <url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>\n' for loc, lastmod in rows)
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{_XMLNS}">\n{body}</urlset>\n'
+
+
+def build_sitemaps(urls, out: Path, changes, store, *, base: str, today: str) -> list[str]:
+    """Write docs/sitemap.xml and its shards.
+
+    urls: iterable of (shard name, path relative to the site root, content hash).
+    Returns the shard file names written to the index.
+    """
+    known = store.sitemap_entries()
+    seed = None if known else _existing_lastmods(out/'sitemaps')
+    shards: dict[str, list] = {}
+    rows = []
+    for shard, rel, content in urls:
+        loc = f'{base}/{rel}'
+        prev = known.get(loc)
+        if prev and prev[0] == content:
+            lastmod = prev[1]
+        elif prev is None and seed and loc in seed:
+            lastmod = seed[loc]
+        else:
+            lastmod = today
+        rows.append((loc, content, lastmod))
+        shards.setdefault(shard, []).append((loc, lastmod))
+    store.replace_sitemap(rows)
+
+    shard_dir = out/'sitemaps'
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    index = []
+    for shard in sorted(shards):
+        entries = sorted(shards[shard])
+        parts = [entries[i:i + MAX_URLS] for i in range(0, len(entries), MAX_URLS)]
+        for k, part in enumerate(parts, 1):
+            name = f'{shard}.xml' if k == 1 else f'{shard}-{k}.xml'
+            changes.write(shard_dir/name, _urlset(part))
+            written.append(name)
+            index.append((f'{base}/sitemaps/{name}', max(lastmod for _loc, lastmod in part)))
+    for path in sorted(shard_dir.glob('*.xml')):
+        if path.name not in written:
+            changes.remove(path)
+
+    body = ''.join(f'  <sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n'
+                   for loc, lastmod in index)
+    changes.write(out/'sitemap.xml',
+                  f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{_XMLNS}">\n{body}</sitemapindex>\n')
+    return written
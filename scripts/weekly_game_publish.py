@@ -4,8 +4,9 @@
 Creates:
 - games/<slug>/index.html (a tiny game)
 - posts/<slug>.md (a short post that links to the game)
-- rebuilds docs via scripts/generate.py
-- commits + pushes via deploy key (same mechanism as daily_publish.py)
+- rebuilds docs via generate.build_site (in-process)
+- stages only the new sources + changed outputs, commits + pushes via deploy key
+  (same mechanism as daily_publish.py)
 
 Goal: fully automated, no API keys, minimal dependencies.
 
@@ -23,16 +24,12 @@ import argparse
 import datetime as dt
 import os
 import shutil
-import subprocess
 from pathlib import Path
 
-REPO_DIR = Path(__file__).resolve().parents[1]
-KEY_PATH = Path("/home/node/.openclaw/keys/pm-fieldnotes_deploy_key")
-KNOWN_HOSTS = Path("/home/node/.openclaw/ssh/known_hosts")
-
+import generate
+from daily_publish import commit_and_push, stage_build
 
-def run(cmd: list[str], *, check: bool = True) -> None:
-    subprocess.run(cmd, cwd=str(REPO_DIR), check=check)
+REPO_DIR = Path(__file__).resolve().parents[1]
 
 
 def iso_week_slug(today: dt.date | None = None) -> str:
@@ -294,19 +291,12 @@ def main() -> int:
     post_path.write_text(post_md, encoding='utf-8')
 
     # render site
-    run(['python3', 'scripts/generate.py'])
+    os.chdir(REPO_DIR)  # generate.py works with repo-relative paths
+    build = generate.build_site(generate.load_cfg(), changed=[f'posts/{slug}.md'])
 
-    # git commit/push
-    run(['git', 'add', '-A'])
-    run(['git', 'config', 'user.email', 'openclaw-bot@local'])
-    run(['git', 'config', 'user.name', 'OpenClaw'])
-    run(['git', 'commit', '-m', f'game: {slug}'])
-
-    env = os.environ.copy()
-    env['GIT_SSH_COMMAND'] = (
-        f"ssh -i {KEY_PATH} -o IdentitiesOnly=yes -o UserKnownHostsFile={KNOWN_HOSTS} -o StrictHostKeyChecking=yes"
-    )
-    subprocess.run(['git', 'push', 'origin', 'main'], cwd=str(REPO_DIR), check=True, env=env)
+    # git commit/push (stage only the new sources and the outputs the build touched)
+    stage_build([f'games/{slug}', f'posts/{slug}.md'], build)
+    commit_and_push(f'game: {slug}')
 
     print(f"published game {slug}")
     return 0
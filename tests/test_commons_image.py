@@ -0,0 +1,212 @@
+"""commons_image.py / http_session.py against a local stand-in Commons server.
+
+The server speaks HTTP/1.1 keep-alive, serves a search API response whose
+candidates point back at itself, and counts connections and requests, so
+candidate picking, concurrent HEAD probing, redirects, the download size
+cap, connection reuse and warm-cache reruns are checked without touching the network.
+
+Run: python3 -m pytest tests/  (or python3 -m unittest discover tests)
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+import commons_image  # noqa: E402
+from commons_cache import CommonsCache  # noqa: E402
+from commons_image import DownloadTooLarge, pick_candidate, probe_candidates, stream_download  # noqa: E402
+from http_session import HttpSession  # noqa: E402
+
+# path -> (Content-Type, body)
+FILES = {
+    '/big.jpg': ('image/jpeg', b'\xff\xd8' + b'b' * (3 * 1024 * 1024)),
+    '/small.jpg': ('image/jpeg', b'\xff\xd8' + b's' * (300 * 1024)),
+    '/doc.pdf': ('application/pdf', b'%PDF' + b'p' * 1024),
+    '/tiny.png': ('image/png', b'\x89PNG' + b't' * 512),
+}
+
+
+def _page(index: int, name: str, base: str, *, width: int, size: int, mime: str) -> dict:
+    return {'index': index, 'title': f'File:{name}', 'imageinfo': [{
+        'url': f'{base}/{name}', 'width': width, 'height': width * 2 // 3, 'size': size, 'mime': mime,
+        'extmetadata': {'Artist': {'value': 'Tester'}, 'LicenseShortName': {'value': 'CC BY 4.0'}},
+    }]}
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, ctype: str, body: bytes, *, headers=()) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _serve(self) -> None:
+        u = urllib.parse.urlsplit(self.path)
+        q = urllib.parse.parse_qs(u.query)
+        with self.server.lock:
+            self.server.requests.append((self.command, u.path))
+        if 'delay' in q:
+            time.sleep(float(q['delay'][0]))
+        if u.path == '/w/api.php':
+            base = f'http://127.0.0.1:{self.server.server_port}'
+            pages = {
+                '1': _page(1, 'big.jpg', base, width=4000, size=len(FILES['/big.jpg'][1]), mime='image/jpeg'),
+                # the API under-reports this one; the HEAD answer must win
+                '2': _page(2, 'small.jpg', base, width=1200, size=10, mime='image/jpeg'),
+                '3': _page(3, 'doc.pdf', base, width=2000, size=100, mime='application/pdf'),
+                '4': _page(4, 'tiny.png', base, width=64, size=516, mime='image/png'),
+            }
+            self._send(200, 'application/json', json.dumps({'query': {'pages': pages}}).encode())
+        elif u.path.startswith('/redirect/'):
+            self._send(302, 'text/plain', b'', headers=[('Location', '/' + u.path[len('/redirect/'):])])
+        elif u.path in FILES:
+            ctype, body = FILES[u.path]
+            self._send(200, ctype, body)
+        else:
+            self._send(404, 'text/plain', b'not found')
+
+    do_GET = do_HEAD = _serve
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # the size-cap test hangs up mid-body on purpose
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class CommonsStandInTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInServer(('127.0.0.1', 0), StandIn)
+        cls.server.lock = threading.Lock()
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        with self.server.lock:
+            self.server.connections = 0
+            self.server.requests = []
+        self.session = HttpSession(timeout=10)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_pick_candidate_prefers_smallest_wide_image(self):
+        cands = [
+            {'url': 'a', 'mime': 'image/jpeg', 'bytes': 3_000_000, 'width': 4000},
+            {'url': 'b', 'mime': 'image/jpeg', 'bytes': 300_000, 'width': 1200},
+            {'url': 'c', 'mime': 'application/pdf', 'bytes': 100, 'width': 2000},
+            {'url': 'd', 'mime': 'image/png', 'bytes': 500, 'width': 64},
+            {'url': 'e', 'mime': 'image/jpeg', 'bytes': None, 'width': 3000},
+        ]
+        self.assertEqual(pick_candidate(cands)['url'], 'b')
+        # over the byte cap: only the narrow images remain, the widest wins
+        self.assertEqual(pick_candidate(cands, max_bytes=250_000)['url'], 'd')
+        self.assertEqual(pick_candidate(cands, min_width=5000)['url'], 'a')
+        self.assertIsNone(pick_candidate(cands[2:3]))
+
+    def test_probes_run_concurrently_and_headers_win(self):
+        pages = {str(i): _page(i, f'{name}?delay=0.4', self.base, width=1000, size=1, mime='image/jpeg')
+                 for i, name in enumerate(['big.jpg', 'small.jpg', 'doc.pdf', 'tiny.png'])}
+        t0 = time.monotonic()
+        cands = probe_candidates(pages, self.session)
+        elapsed = time.monotonic() - t0
+        self.assertLess(elapsed, 1.2, 'four 0.4 s HEADs should overlap')
+        by_name = {c['url'].rsplit('/', 1)[1].split('?')[0]: c for c in cands}
+        self.assertEqual(by_name['small.jpg']['bytes'], len(FILES['/small.jpg'][1]))
+        self.assertEqual(by_name['doc.pdf']['mime'], 'application/pdf')
+        self.assertTrue(all(m == 'HEAD' for m, _p in self.server.requests))
+
+    def test_redirects_are_followed(self):
+        dest = self.tmp / 'out.jpg'
+        stats = stream_download(f'{self.base}/redirect/small.jpg', dest, self.session)
+        self.assertEqual(dest.read_bytes(), FILES['/small.jpg'][1])
+        self.assertEqual(stats['bytes'], len(FILES['/small.jpg'][1]))
+        self.assertEqual(self.server.requests, [('GET', '/redirect/small.jpg'), ('GET', '/small.jpg')])
+
+    def test_content_length_cap_aborts_before_body(self):
+        dest = self.tmp / 'big.jpg'
+        with self.assertRaises(DownloadTooLarge):
+            stream_download(f'{self.base}/big.jpg', dest, self.session, max_bytes=1024 * 1024)
+        self.assertEqual(list(self.tmp.iterdir()), [], 'no partial file may be left behind')
+
+    def test_keep_alive_connections_are_reused(self):
+        for name in ('tiny.png', 'doc.pdf', 'tiny.png', 'redirect/tiny.png'):
+            stream_download(f'{self.base}/{name}', self.tmp / 'x', self.session)
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_fetch_image_end_to_end(self):
+        orig = commons_image.WIKI_API
+        commons_image.WIKI_API = f'{self.base}/w/api.php'
+        try:
+            meta = commons_image.fetch_image('2026-01-01-test', 'warehouse,kpi',
+                                             session=self.session, out_dir=self.tmp)
+        finally:
+            commons_image.WIKI_API = orig
+        self.assertEqual(Path(meta['local_path']).name, '2026-01-01-test.jpg')
+        self.assertEqual(Path(meta['local_path']).read_bytes(), FILES['/small.jpg'][1])
+        methods = [m for m, _p in self.server.requests]
+        self.assertEqual(methods.count('HEAD'), 4)
+        self.assertEqual(len(methods), 6)  # search + 4 HEADs + download
+        # the HEADs are concurrent, so up to one connection each; the search
+        # connection is reused by one of them and the download reuses another
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_warm_cache_makes_no_requests(self):
+        cache = CommonsCache(self.tmp / 'cache')
+        orig = commons_image.WIKI_API
+        commons_image.WIKI_API = f'{self.base}/w/api.php'
+        try:
+            first = commons_image.fetch_image('2026-01-01-a', 'warehouse,kpi', cache=cache,
+                                              session=self.session, out_dir=self.tmp / 'a')
+            self.assertEqual(len(self.server.requests), 6)
+            with self.server.lock:
+                self.server.requests = []
+            again = commons_image.fetch_image('2026-01-01-a', 'warehouse,kpi', cache=cache,
+                                              session=self.session, out_dir=self.tmp / 'b')
+        finally:
+            commons_image.WIKI_API = orig
+        self.assertEqual(self.server.requests, [])
+        self.assertTrue(again['download']['cached'])
+        self.assertEqual(Path(again['local_path']).read_bytes(), Path(first['local_path']).read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()